@@ -1,72 +1,40 @@
+import argparse
+import cProfile
+import csv
+import json
+import os
+import sys
+from itertools import chain, islice
 import numpy as np
+from healCalc_engine import (
+    roll_stream, compare_builds, evaluate_builds, evaluate_skills, load_skills, heal_moments, heal_gradient, optimize_stats,
+    simulate_rotation, records_as_dicts, read_rune_catalog, explore_runes, store_stat_allocations, SKILLS_PATH, RUNES_PATH,
+    ResultCache, ResultStore, StageTimings, timed, count_event
+)
 
-def maxroll_curve(value, factor):
-    return value / (value + factor)
-
-def calculate_heal(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, trials=100000):
-    # Compute effective multipliers using maxroll returns
-    effective_sdb = maxroll_curve(sdb, 3000)
-    effective_crit = maxroll_curve(crit, 6000)
-    effective_hac = maxroll_curve(hac, 1000)
-    
-    # Compute skill damage range
-    min_skill_damage = (base_min_damage * 6.1) + 232
-    max_skill_damage = (base_max_damage * 6.1) + 232
-    
-    # Compute healing range
-    min_heal = min_skill_damage * (1 + effective_sdb) * (1 + skill_heal)
-    max_heal = max_skill_damage * (1 + effective_sdb) * (1 + skill_heal)
-    
-    # Compute probabilities
-    crit_prob = effective_crit
-    hac_prob = effective_hac
-    
-    # Monte Carlo Simulation
-    heal_values = []
-    crit_count = 0
-    hac_count = 0
-    crit_hac_count = 0
-    
-    for _ in range(trials):
-        heal = np.random.uniform(min_heal, max_heal)
-        is_crit = np.random.rand() < crit_prob
-        is_hac = np.random.rand() < hac_prob
-        
-        if is_crit:
-            heal = max_heal  # Crit ensures max heal
-            crit_count += 1
-        if is_hac:
-            heal *= 2  # Heavy Attack doubles heal
-            hac_count += 1
-        if is_crit and is_hac:
-            crit_hac_count += 1
-        
-        heal_values.append(heal)
-    
+# Columns every build row needs, in calculate_heal's argument order
+BUILD_FIELDS = ["base_min_damage", "base_max_damage", "skill_heal", "sdb", "hac", "crit"]
+
+def rune_builds(skill_heal, sdb, hac, crit):
+    # (skill_heal, sdb, hac, crit) for the base case and each rune
     return {
-        "avg_heal": np.mean(heal_values),
-        "min_heal": min_heal,
-        "max_heal": max_heal,
-        "percentiles": np.percentile(heal_values, [5, 50, 95]),
-        "sdb_maxroll": effective_sdb,
-        "crit_maxroll": effective_crit,
-        "hac_maxroll": effective_hac,
-        "crit_percentage": (crit_count / trials) * 100,
-        "hac_percentage": (hac_count / trials) * 100,
-        "crit_hac_percentage": (crit_hac_count / trials) * 100
+        "Base": (skill_heal, sdb, hac, crit),
+        "+30 Skill Damage Boost": (skill_heal, sdb + 30, hac, crit),
+        "+30 Heavy Attack Chance": (skill_heal, sdb, hac + 30, crit),
+        "+30 Crit Chance": (skill_heal, sdb, hac, crit + 30),
+        "+3% Skill Heal (Chaos Rune)": (skill_heal + 0.03, sdb, hac, crit)
     }
 
-def compare_runes(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit):
-    results = {}
-    
-    # Base Case (No Rune)
-    results["Base"] = calculate_heal(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit)
-    
-    # Adding Runes
-    results["+30 Skill Damage Boost"] = calculate_heal(base_min_damage, base_max_damage, skill_heal, sdb + 30, hac, crit)
-    results["+30 Heavy Attack Chance"] = calculate_heal(base_min_damage, base_max_damage, skill_heal, sdb, hac + 30, crit)
-    results["+30 Crit Chance"] = calculate_heal(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit + 30)
-    results["+3% Skill Heal (Chaos Rune)"] = calculate_heal(base_min_damage, base_max_damage, skill_heal + 0.03, sdb, hac, crit)
+def compare_runes(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, mode="monte_carlo", paired=True, trials=100000, target_ci=None, seed=None, workers=1, cache=None, timings=None):
+    """Compare and print the rune builds against the base build
+
+    workers > 1 runs in spawned processes, so a script calling this needs an
+    `if __name__ == "__main__":` guard (see run_trial_chunks).
+    """
+    builds = rune_builds(skill_heal, sdb, hac, crit)
+    results = compare_builds(
+        base_min_damage, base_max_damage, builds, "Base", mode, paired, trials, target_ci, seed, workers, cache, timings
+    )
     
     # Print results
     for rune, data in results.items():
@@ -79,9 +47,490 @@ def compare_runes(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit):
         print(f"    Crit Chance %: {data['crit_percentage']:.2f}")
         print(f"    HAC Chance %: {data['hac_percentage']:.2f}")
         print(f"    Crit + HAC Chance %: {data['crit_hac_percentage']:.2f}")
+        if data["trials"]:
+            print(f"    Trials: {data['trials']:,} (avg heal ± {data['avg_heal_ci']:.2f}, 95% CI)")
+        if "gain" in data and rune != "Base":
+            # Both intervals are 95% CIs, so the gain's can be read against the average heal's
+            print(f"    Gain vs Base: {data['gain']:+.2f} ± {1.96 * data['gain_se']:.2f} (95% CI)")
         print()
     
     return results
 
-# Example usage
-compare_runes(base_min_damage=157, base_max_damage=306, skill_heal=0.5591, sdb=460, hac=600, crit=630)
+def read_build_rows(stream, input_format):
+    """Yield each build row of a CSV (with a header) or JSONL stream as a dict
+
+    With no input_format the first non-blank line decides: JSONL rows are
+    objects, anything else is a CSV header.
+    """
+    if input_format is None:
+        lines = iter(stream)
+        first = next((line for line in lines if line.strip()), None)
+        if first is None:
+            return
+        input_format = "jsonl" if first.lstrip().startswith("{") else "csv"
+        stream = chain([first], lines)
+    if input_format == "csv":
+        reader = csv.DictReader(stream)
+        # A header without the build fields (JSONL read as CSV, say) would otherwise yield rows that fail later or not at all
+        if reader.fieldnames is not None:
+            missing = [field for field in BUILD_FIELDS if field not in reader.fieldnames]
+            if missing:
+                raise ValueError(f"the CSV header has no {', '.join(missing)} column")
+        yield from reader
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+def build_columns(batch, count):
+    """BUILD_FIELDS columns of a batch of build rows, the first being row count + 1 of the input"""
+    try:
+        return np.array([[float(row[field]) for field in BUILD_FIELDS] for row in batch]).T
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Rows {count + 1}-{count + len(batch)}: every row needs numeric {', '.join(BUILD_FIELDS)} ({e})")
+
+def evaluate_roster(input_stream, output_stream, input_format="csv", output_format="jsonl", mode="analytic", trials=10000, seed=None, batch_size=4096, timings=None):
+    """Stream build rows through evaluate_builds batch by batch, writing each result row as it is done
+
+    BUILD_FIELDS are written as the numbers they parse to; other columns (a
+    name, say) are copied to the output as they are.
+    Only one batch is held at a time, so any number of rows fits in memory.
+    Returns the number of rows evaluated.
+    """
+    # One roll stream for the whole roster, so Monte Carlo builds are compared on the same draws
+    rolls = roll_stream(trials, seed) if mode == "monte_carlo" else None
+    rows = read_build_rows(input_stream, input_format)
+    writer = None
+    count = 0
+    
+    while True:
+        with timed(timings, "evaluate: read rows"):
+            batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        
+        with timed(timings, "evaluate: compute batch"):
+            stats = build_columns(batch, count)
+            results = evaluate_builds(*stats, mode=mode, rolls=rolls)
+        if rolls is not None:
+            count_event(timings, "trials simulated", rolls["trials"] * len(batch))
+        count_event(timings, "builds evaluated", len(batch))
+        
+        with timed(timings, "evaluate: write rows"):
+            # The whole record array becomes Python numbers at once rather than field by field.
+            # BUILD_FIELDS are written as parsed, so CSV input gives numbers like JSONL does.
+            records = [
+                {**row, **dict(zip(BUILD_FIELDS, build)), **result}
+                for row, build, result in zip(batch, stats.T.tolist(), records_as_dicts(results))
+            ]
+            if output_format == "csv":
+                if writer is None:
+                    writer = csv.DictWriter(output_stream, fieldnames=list(records[0]), extrasaction="ignore")
+                    writer.writeheader()
+                writer.writerows(records)
+            else:
+                output_stream.writelines(json.dumps(record) + "\n" for record in records)
+            
+            output_stream.flush()
+        count += len(batch)
+    
+    return count
+
+def evaluate_roster_to_store(input_stream, store, input_format="csv", mode="analytic", trials=10000, seed=None, batch_size=4096, timings=None):
+    """evaluate_roster into a ResultStore, one chunk per batch, resuming after its last completed chunk
+
+    The store keeps each row's BUILD_FIELDS and numeric results; other columns
+    are not stored. Input rows the store already holds are skipped, so rerunning
+    a job that died on the same input picks up where it stopped. Returns the
+    number of rows the store holds.
+    """
+    if mode == "monte_carlo" and seed is None:
+        # Resumed chunks must be simulated on the same draws as the first ones, so a fresh seed is kept in the store
+        seed = np.random.SeedSequence((store.meta or {}).get("seed")).entropy
+    job = {"job": "evaluate", "mode": mode, "trials": trials, "seed": seed, "batch_size": batch_size}
+    count = store.start(job)
+    rolls = roll_stream(trials, seed) if mode == "monte_carlo" else None
+    rows = islice(read_build_rows(input_stream, input_format), count, None)
+    
+    while True:
+        with timed(timings, "evaluate: read rows"):
+            batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        
+        with timed(timings, "evaluate: compute batch"):
+            stats = build_columns(batch, count)
+            results = evaluate_builds(*stats, mode=mode, rolls=rolls)
+        if rolls is not None:
+            count_event(timings, "trials simulated", rolls["trials"] * len(batch))
+        count_event(timings, "builds evaluated", len(batch))
+        
+        with timed(timings, "evaluate: store chunk"):
+            store.append({**dict(zip(BUILD_FIELDS, stats)), **{name: results[name] for name in results.dtype.names}})
+        count += len(batch)
+    
+    return count
+
+def print_store(store, sort="avg_heal", top=10, ascending=False, fields=None):
+    """Print what a result store holds and its top rows by one field, reading only the rows shown"""
+    print(f"{store.path}: {store.rows:,} rows in {store.chunks:,} chunks")
+    print(f"    Job: {json.dumps(store.meta)}")
+    fields = fields or list(store.fields)
+    for field in [sort, *fields]:
+        if field not in store:
+            raise ValueError(f"no field {field!r}; the store has {', '.join(store.fields)}")
+    if not store.rows:
+        return
+    
+    # Ranking touches the one column; the rows shown are then gathered from each column
+    values = store[sort]
+    top = min(top, store.rows)
+    keys = values if ascending else -values
+    rows = np.argpartition(keys, top - 1)[:top]
+    rows = rows[np.argsort(keys[rows], kind="stable")]
+    print()
+    print(f"{'Row':>10} " + " ".join(f"{field[:12]:>12}" for field in fields))
+    columns = {field: store[field][rows] for field in fields}
+    for i, row in enumerate(rows):
+        print(f"{row:10d} " + " ".join(f"{columns[field][i]:12.4g}" for field in fields))
+
+def guess_format(path, default):
+    """csv or jsonl from a file extension, or default for stdin/stdout and other names"""
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".jsonl", ".json", ".ndjson")):
+        return "jsonl"
+    return default
+
+def print_optimization(optimization, current, frontier_rows=10):
+    """Print the best allocation, how it compares to the current one, and the Pareto frontier"""
+    best = optimization["best"]
+    print(f"Budget: {optimization['budget']:,.0f} split {optimization['candidates']:,} ways (step {optimization['step']:.2f})")
+    print(f"Best: SDB {best['sdb']:.0f} / HAC {best['hac']:.0f} / Crit {best['crit']:.0f}")
+    print(f"    Average Heal: {best['avg_heal']:.2f} (std dev {best['std_heal']:.2f})")
+    print(f"Current: SDB {current['sdb']:.0f} / HAC {current['hac']:.0f} / Crit {current['crit']:.0f}")
+    print(f"    Average Heal: {current['avg_heal']:.2f} (std dev {current['std_heal']:.2f})")
+    gain = best["avg_heal"] - current["avg_heal"]
+    print(f"    Gain from re-allocating: {gain:+.2f} ({gain / current['avg_heal'] * 100:+.2f}%)")
+    print()
+    
+    # The frontier trades average heal against consistency; show an even spread of it
+    frontier = optimization["frontier"]
+    rows = np.unique(np.linspace(0, len(frontier) - 1, min(frontier_rows, len(frontier))).astype(int))
+    print("Pareto frontier (no other split heals more on average with less spread):")
+    print(f"    {'SDB':>6} {'HAC':>6} {'Crit':>6} {'Avg Heal':>10} {'Std Dev':>10}")
+    for i in rows:
+        point = frontier[i]
+        print(f"    {point['sdb']:6.0f} {point['hac']:6.0f} {point['crit']:6.0f} {point['avg_heal']:10.2f} {point['std_heal']:10.2f}")
+
+def print_marginal(gradient):
+    """Print the heal each stat adds per point and per +30 rune, and what a point of it is worth in the others"""
+    print(f"{'Stat':<6} {'Heal/Point':>11} {'Heal/+30':>10} {'= SDB':>8} {'= HAC':>8} {'= Crit':>8}")
+    for stat, per_point in gradient.items():
+        exchange = " ".join(f"{per_point / gradient[other]:8.3f}" for other in ["sdb", "hac", "crit"])
+        print(f"{stat.upper():<6} {per_point:11.4f} {per_point * 30:10.2f} {exchange}")
+
+def print_skills(evaluation):
+    """Print every skill's heal for the build, most healing first"""
+    print(f"{'Skill':<30} {'Avg Heal':>10} {'Min Heal':>10} {'Max Heal':>10} {'Crit %':>7} {'HAC %':>7}")
+    for i in np.argsort(-evaluation["avg_heal"], kind="stable"):
+        print(
+            f"{evaluation['name'][i]:<30} {evaluation['avg_heal'][i]:10.2f} {evaluation['min_heal'][i]:10.2f} "
+            f"{evaluation['max_heal'][i]:10.2f} {evaluation['crit_percentage'][i]:7.2f} {evaluation['hac_percentage'][i]:7.2f}"
+        )
+
+def print_exploration(exploration):
+    """Print how many rune combinations were searched and the top builds with their gain over the base"""
+    print(f"Combinations: {exploration['combinations']:,} ({exploration['evaluated']:,} evaluated after pruning)")
+    print(f"Base Stats: Average Heal = {exploration['base_avg_heal']:.2f}")
+    print()
+    for rank, build in enumerate(exploration["top"], 1):
+        gain = f"{build['gain']:+.2f}"
+        if "gain_se" in build:
+            gain += f" ± {1.96 * build['gain_se']:.2f}, 95% CI"
+        print(f"#{rank}: Average Heal = {build['avg_heal']:.2f} (gain vs base {gain})")
+        print(f"    Skill Heal {build['skill_heal'] * 100:.2f}% / SDB {build['sdb']:.0f} / HAC {build['hac']:.0f} / Crit {build['crit']:.0f}")
+        print(f"    Runes: {', '.join(build['runes'])}")
+
+def parse_cast(text):
+    """A rotation cast from NAME:CAST_TIME[:COOLDOWN[:COEFFICIENT[:FLAT]]]"""
+    fields = text.split(":")
+    if not 2 <= len(fields) <= 5:
+        raise argparse.ArgumentTypeError(f"expected NAME:CAST_TIME[:COOLDOWN[:COEFFICIENT[:FLAT]]], got {text!r}")
+    cast = {"name": fields[0]}
+    for field, value in zip(["cast_time", "cooldown", "coefficient", "flat"], fields[1:]):
+        try:
+            cast[field] = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"{field} of {fields[0]!r} must be a number, got {value!r}")
+    return cast
+
+def print_rotation(rotation, curve_points=10):
+    """Print the HPS spread, the time taken to reach each heal target and the cumulative heal curve"""
+    print(f"Encounter: {rotation['duration']:g}s, {rotation['casts']:,} casts ({', '.join(f'{name} x{count}' for name, count in rotation['cast_counts'].items())})")
+    print(f"HPS: {rotation['hps']:.2f} ± {rotation['hps_ci']:.2f} (95% CI, {rotation['trials']:,} encounters)")
+    print(f"    Exact: {rotation['exact_hps']:.2f} (std dev {rotation['exact_hps_std']:.2f})")
+    p5, p50, p95 = rotation["hps_percentiles"]
+    print(f"    Std dev: {rotation['hps_std']:.2f}, 5th/50th/95th percentile: {p5:.2f} / {p50:.2f} / {p95:.2f}")
+    for target, reach in rotation["time_to_heal"].items():
+        # Percentiles over all encounters are infinite where too few of them reach the target
+        p5, p50, p95 = (f"{seconds:.1f}s" if np.isfinite(seconds) else "not reached" for seconds in reach["percentiles"])
+        print(f"Time to heal {target:,.0f}: reached in {reach['reached'] * 100:.1f}% of encounters")
+        if reach["reached"]:
+            print(f"    Mean {reach['mean_seconds']:.1f}s of encounters that reached it, 5th/50th/95th percentile of all: {p5} / {p50} / {p95}")
+    print()
+    
+    # An even spread of landing times along the curve
+    land_times = rotation["land_times"]
+    rows = np.unique(np.linspace(0, len(land_times) - 1, min(curve_points, len(land_times))).astype(int))
+    print("Cumulative heal:")
+    print(f"    {'Time':>8} {'Heal':>12} {'Std Dev':>10}")
+    for i in rows:
+        print(f"    {land_times[i]:7.1f}s {rotation['cumulative_heal'][i]:12.0f} {rotation['cumulative_heal_std'][i]:10.0f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Throne & Liberty healer calculator",
+        epilog="With no command, compare runs with the options given: healCalc.py --seed 1 is healCalc.py compare --seed 1."
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    
+    # Character stats shared by every command, defaulting to the example build
+    build = argparse.ArgumentParser(add_help=False)
+    build.add_argument("--base-min-damage", type=float, default=157)
+    build.add_argument("--base-max-damage", type=float, default=306)
+    build.add_argument("--skill-heal", type=float, default=0.5591, help="Skill heal as a fraction (0.5591 = 55.91%%)")
+    build.add_argument("--sdb", type=float, default=460)
+    build.add_argument("--hac", type=float, default=600)
+    build.add_argument("--crit", type=float, default=630)
+    
+    # Opt-in diagnostics shared by every command
+    diagnostics = argparse.ArgumentParser(add_help=False)
+    diagnostics.add_argument("--timings", metavar="PATH", help="Write per-stage timings and counters as JSON ('-' for stderr)")
+    diagnostics.add_argument("--cprofile", metavar="PATH", help="Write a cProfile report of the command, readable with pstats or snakeviz")
+    
+    # Rune comparison (also the default with no command)
+    compare = subparsers.add_parser("compare", parents=[build, diagnostics], help="Compare +30 runes and a Chaos rune against a base build")
+    compare.add_argument("--trials", type=int, default=100000)
+    compare.add_argument("--mode", choices=["monte_carlo", "analytic"], default="monte_carlo")
+    compare.add_argument("--unpaired", action="store_true", help="Give every build independent random draws")
+    compare.add_argument("--target-ci", type=float, help="Simulate until every 95%% CI half-width is within this: of each rune's gain over the base when paired, of each build's average heal with --unpaired")
+    compare.add_argument("--seed", type=int, help="Seed for reproducible results (for a given worker count)")
+    compare.add_argument("--workers", type=int, default=1, help="Processes to split the trials across")
+    compare.add_argument("--cache", metavar="PATH", help="Reuse seeded and analytic results saved in this file, and save new ones")
+    
+    # Stat budget optimizer
+    optimize = subparsers.add_parser("optimize", parents=[build, diagnostics], help="Find the SDB/HAC/crit split of a stat budget that heals the most")
+    optimize.add_argument("--budget", type=float, help="Total SDB + HAC + crit to split (default: the current total)")
+    for stat in ["sdb", "hac", "crit"]:
+        optimize.add_argument(f"--{stat}-range", type=float, nargs=2, metavar=("MIN", "MAX"), help=f"Bounds on {stat.upper()} (default: 0 to the budget)")
+    optimize.add_argument("--step", type=float, help="Approximate grid spacing of the candidate splits (default: budget / 250)")
+    optimize.add_argument("--frontier", type=int, default=10, help="Pareto frontier rows to print")
+    optimize.add_argument("--store", metavar="DIR", help="Write every scored split to this result store, resuming a run that stopped")
+    optimize.add_argument("--chunk-rows", type=int, default=1 << 20, help="Splits scored and stored per chunk with --store")
+    
+    # Bulk evaluation of a roster of builds
+    evaluate = subparsers.add_parser("evaluate", parents=[diagnostics], help="Evaluate every build in a CSV/JSONL file or stdin, writing one result row per build")
+    evaluate.add_argument("input", nargs="?", default="-", help="Build file with columns " + ", ".join(BUILD_FIELDS) + " (default: stdin)")
+    evaluate.add_argument("-o", "--output", default="-", help="Result file (default: stdout)")
+    evaluate.add_argument("--input-format", choices=["csv", "jsonl"], help="Default: from the file extension, else sniffed from the first line")
+    evaluate.add_argument("--output-format", choices=["csv", "jsonl"], help="Default: from the file extension, else jsonl")
+    evaluate.add_argument("--mode", choices=["analytic", "monte_carlo"], default="analytic")
+    evaluate.add_argument("--trials", type=int, default=10000, help="Monte Carlo trials per build")
+    evaluate.add_argument("--seed", type=int, help="Seed for reproducible Monte Carlo results")
+    evaluate.add_argument("--batch-size", type=int, default=4096, help="Builds evaluated per vectorized batch")
+    evaluate.add_argument("--store", metavar="DIR", help="Write the builds and results to this result store instead of --output, resuming a run that stopped")
+    
+    # Healing throughput of a rotation over whole encounters
+    rotation = subparsers.add_parser("rotation", parents=[build, diagnostics], help="Simulate encounters of a cast rotation for HPS and cumulative healing")
+    rotation.add_argument(
+        "--cast", type=parse_cast, action="append", metavar="NAME:CAST_TIME[:COOLDOWN[:COEFFICIENT[:FLAT]]]",
+        help="A cast of the priority rotation, highest priority first; times in seconds, damage coefficient and flat bonus default to 6.1 and 232 (default: one 1s cast)"
+    )
+    rotation.add_argument("--duration", type=float, default=120, help="Encounter length in seconds")
+    rotation.add_argument("--trials", type=int, default=10000, help="Encounters to simulate")
+    rotation.add_argument("--heal-target", type=float, action="append", default=[], help="Report how soon encounters heal this much in total (repeatable)")
+    rotation.add_argument("--seed", type=int, help="Seed for reproducible results")
+    rotation.add_argument("--curve-points", type=int, default=10, help="Cumulative heal curve rows to print")
+    
+    # Exact heal per stat point
+    subparsers.add_parser("marginal", parents=[build, diagnostics], help="Heal gained per extra point of SDB, HAC and crit")
+    
+    # Every skill of the skill table for one build
+    skills = subparsers.add_parser("skills", parents=[build, diagnostics], help="Evaluate every skill of the skill table for a build")
+    skills.add_argument("--skills", default=SKILLS_PATH, metavar="PATH", help="Skill table JSON (default: skills.json next to this script)")
+    skills.add_argument("--mode", choices=["analytic", "monte_carlo"], default="analytic")
+    skills.add_argument("--trials", type=int, default=100000, help="Monte Carlo trials, shared by every skill")
+    skills.add_argument("--seed", type=int, help="Seed for reproducible Monte Carlo results")
+    
+    # Every combination of runes from an inventory
+    explore = subparsers.add_parser("explore", parents=[build, diagnostics], help="Find the combinations of catalog runes that heal the most")
+    explore.add_argument("--catalog", default=RUNES_PATH, metavar="PATH", help="Rune catalog JSON (default: runes.json next to this script)")
+    explore.add_argument("--runes", type=int, help="Runes per combination (default: every slot filled)")
+    explore.add_argument("--top", type=int, default=10, help="Best combinations to print")
+    explore.add_argument("--mode", choices=["analytic", "monte_carlo"], default="analytic")
+    explore.add_argument("--trials", type=int, default=100000, help="Monte Carlo trials for the top combinations and the base")
+    explore.add_argument("--seed", type=int, help="Seed for reproducible Monte Carlo results")
+    
+    # Reopen a result store written with --store
+    query = subparsers.add_parser("query", parents=[diagnostics], help="Show the job and top rows of a result store")
+    query.add_argument("store", metavar="DIR", help="Result store written by evaluate or optimize with --store")
+    query.add_argument("--sort", default="avg_heal", help="Field to rank the rows by")
+    query.add_argument("--top", type=int, default=10, help="Rows to print")
+    query.add_argument("--ascending", action="store_true", help="Show the lowest values instead of the highest")
+    query.add_argument("--fields", nargs="+", metavar="FIELD", help="Fields to print (default: all)")
+    
+    # compare is the default command, so options given without a command are compare's
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["compare", *argv]
+    args = parser.parse_args(argv)
+    
+    # Diagnostics are opt-in: stage timings and counters, and/or a cProfile of the whole command
+    timings = StageTimings() if args.timings else None
+    profile = cProfile.Profile() if args.cprofile else None
+    if profile is not None:
+        profile.enable()
+    try:
+        with timed(timings, f"{args.command}: total"):
+            run_command(parser, args, timings)
+    finally:
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(args.cprofile)
+    
+    if timings is not None:
+        if args.timings == "-":
+            json.dump(timings.report(), sys.stderr, indent=2)
+            print(file=sys.stderr)
+        else:
+            with open(args.timings, "w") as f:
+                json.dump(timings.report(), f, indent=2)
+
+def run_command(parser, args, timings=None):
+    """Carry out the parsed command"""
+    if args.command == "query":
+        if not os.path.exists(os.path.join(args.store, "manifest.json")):
+            parser.error(f"{args.store} is not a result store")
+        try:
+            print_store(ResultStore(args.store), args.sort, args.top, args.ascending, args.fields)
+        except ValueError as e:
+            parser.error(str(e))
+        return
+    
+    if args.command == "evaluate" and args.store:
+        input_format = args.input_format or guess_format(args.input, None)
+        input_stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+        store = ResultStore(args.store)
+        resumed = store.rows
+        try:
+            count = evaluate_roster_to_store(
+                input_stream, store, input_format, args.mode, args.trials, args.seed, args.batch_size, timings
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        finally:
+            if input_stream is not sys.stdin:
+                input_stream.close()
+        print(f"{args.store}: {count:,} rows ({count - resumed:,} evaluated now, {resumed:,} resumed)")
+        return
+    
+    if args.command == "evaluate":
+        input_format = args.input_format or guess_format(args.input, None)
+        output_format = args.output_format or guess_format(args.output, "jsonl")
+        input_stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+        output_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+        try:
+            evaluate_roster(
+                input_stream, output_stream, input_format, output_format, args.mode, args.trials, args.seed, args.batch_size,
+                timings
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        finally:
+            for stream in (input_stream, output_stream):
+                if stream not in (sys.stdin, sys.stdout):
+                    stream.close()
+        return
+    
+    if args.command == "marginal":
+        print_marginal(heal_gradient(args.base_min_damage, args.base_max_damage, args.skill_heal, args.sdb, args.hac, args.crit))
+        return
+    
+    if args.command == "skills":
+        try:
+            table = load_skills(args.skills)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"cannot read the skill table: {e}")
+        rolls = roll_stream(args.trials, args.seed) if args.mode == "monte_carlo" else None
+        with timed(timings, "skills: evaluate"):
+            evaluation = evaluate_skills(
+                args.base_min_damage, args.base_max_damage, args.skill_heal, args.sdb, args.hac, args.crit, table,
+                args.mode, rolls
+            )
+        print_skills(evaluation)
+        return
+    
+    if args.command == "explore":
+        try:
+            slots, runes = read_rune_catalog(args.catalog)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"cannot read the rune catalog: {e}")
+        rune_count = args.runes if args.runes is not None else sum(slots.values())
+        rolls = roll_stream(args.trials, args.seed) if args.mode == "monte_carlo" else None
+        try:
+            exploration = explore_runes(
+                args.base_min_damage, args.base_max_damage, args.skill_heal, args.sdb, args.hac, args.crit, slots, runes,
+                rune_count, args.top, args.mode, rolls, timings
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        print_exploration(exploration)
+        return
+    
+    if args.command == "rotation":
+        casts = args.cast or [{"name": "Skill", "cast_time": 1.0}]
+        try:
+            result = simulate_rotation(
+                args.base_min_damage, args.base_max_damage, args.skill_heal, args.sdb, args.hac, args.crit, casts,
+                args.duration, args.trials, args.heal_target, args.seed, timings
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        print_rotation(result, args.curve_points)
+        return
+    
+    if args.command == "optimize":
+        budget = args.budget if args.budget is not None else args.sdb + args.hac + args.crit
+        bounds = [getattr(args, f"{stat}_range") or (0, budget) for stat in ["sdb", "hac", "crit"]]
+        try:
+            with timed(timings, "optimize: search"):
+                if args.store:
+                    optimization = store_stat_allocations(
+                        ResultStore(args.store), args.base_min_damage, args.base_max_damage, args.skill_heal, budget, bounds,
+                        args.step, args.chunk_rows, timings
+                    )
+                else:
+                    optimization = optimize_stats(args.base_min_damage, args.base_max_damage, args.skill_heal, budget, bounds, args.step)
+        except ValueError as e:
+            parser.error(str(e))
+        
+        avg_heal, std_heal = heal_moments(args.base_min_damage, args.base_max_damage, args.skill_heal, args.sdb, args.hac, args.crit)
+        current = {"sdb": args.sdb, "hac": args.hac, "crit": args.crit, "avg_heal": avg_heal, "std_heal": std_heal}
+        print_optimization(optimization, current, args.frontier)
+        return
+    
+    cache = ResultCache(path=args.cache) if args.cache else None
+    compare_runes(
+        args.base_min_damage, args.base_max_damage, args.skill_heal, args.sdb, args.hac, args.crit,
+        mode=args.mode, paired=not args.unpaired, trials=args.trials, target_ci=args.target_ci,
+        seed=args.seed, workers=args.workers, cache=cache, timings=timings
+    )
+    if cache is not None:
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses")
+        count_event(timings, "cache hits", cache.hits)
+        count_event(timings, "cache misses", cache.misses)
+        cache.save()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # Render figures without a display
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from healCalc_engine import (
+    calculate_heal, analyze_stat_effectiveness, analyze_all_stats, iter_comparison, simulate_rotation, interaction_range,
+    analyze_stat_pair, read_rune_catalog, explore_runes, store_stat_allocations, ResultStore
+)
+from healCalc_gui import HealCalcApp
+
+# (base_min_damage, base_max_damage, skill_heal, sdb, hac, crit) of the example build
+EXAMPLE_BUILD = (157, 306, 0.5591, 460, 600, 630)
+TRIAL_COUNTS = [1000, 10000, 100000, 1000000]
+SWEEP_POINTS = 20
+# A long cooldown heal between 1s filler casts: 288 casts in a 5-minute encounter
+EXAMPLE_ROTATION = [
+    {"name": "Big", "cast_time": 1.5, "cooldown": 12, "coefficient": 12},
+    {"name": "Small", "cast_time": 1.0}
+]
+ROTATION_SECONDS = 300
+ROTATION_ENCOUNTERS = 10000
+# Grid step of the stored optimization: about 1.4 million splits of the example build's 1,690 points
+STORE_STEP = 1
+# Runes the explorer fits into runes.json's 9 slots (16.5 million combinations)
+EXPLORE_RUNES = 9
+# Fixed so every run simulates the same draws
+SEED = 1
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def best_time(function, repeat):
+    """Fastest of repeat calls after an untimed warm-up, in seconds"""
+    function()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def peak_memory(function):
+    """Peak bytes allocated while function runs, NumPy arrays included"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def metric(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+def run_python(*args):
+    """Run a fresh interpreter in this directory, as a user starting a script would"""
+    subprocess.run([sys.executable, *args], cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+
+def gui_comparison():
+    """What a Calculate press does with the GUI defaults: the base build and Rune 1 (+30 SDB), then the three sweeps"""
+    base_min_damage, base_max_damage, skill_heal, sdb, hac, crit = EXAMPLE_BUILD
+    builds = {
+        "Base Stats": (skill_heal, sdb, hac, crit),
+        "Rune 1": (skill_heal, sdb + 30, hac, crit)
+    }
+    results = list(iter_comparison(base_min_damage, base_max_damage, builds, 10000, base_name="Base Stats", seed=SEED))
+    analysis = analyze_all_stats(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, seed=SEED)
+    return results, analysis
+
+def run_benchmarks(repeat=5):
+    """Time every hot path and return {name: metric}"""
+    results = {}
+
+    # Startup: the CLI up to its help text, and importing each module in a fresh interpreter
+    results["cli_startup_seconds"] = metric(best_time(lambda: run_python("healCalc.py", "--help"), repeat), "s", "lower")
+    for module in ["healCalc_engine", "healCalc_gui"]:
+        results[f"{module}_import_seconds"] = metric(best_time(lambda: run_python("-c", f"import {module}"), repeat), "s", "lower")
+
+    for trials in TRIAL_COUNTS:
+        seconds = best_time(lambda: calculate_heal(*EXAMPLE_BUILD, trials=trials, seed=SEED), repeat)
+        results[f"calculate_heal_{trials}_trials_per_second"] = metric(trials / seconds, "trials/s", "higher")
+    results[f"calculate_heal_{TRIAL_COUNTS[-1]}_peak_memory"] = metric(
+        peak_memory(lambda: calculate_heal(*EXAMPLE_BUILD, trials=TRIAL_COUNTS[-1], seed=SEED)), "bytes", "lower"
+    )
+
+    results["gui_comparison_seconds"] = metric(best_time(gui_comparison, repeat), "s", "lower")
+    results["gui_comparison_peak_memory"] = metric(peak_memory(gui_comparison), "bytes", "lower")
+
+    for mode in ["monte_carlo", "analytic"]:
+        seconds = best_time(
+            lambda: analyze_stat_effectiveness(*EXAMPLE_BUILD, "sdb", SWEEP_POINTS, 10000, mode, seed=SEED), repeat
+        )
+        results[f"sweep_{mode}_seconds_per_point"] = metric(seconds / SWEEP_POINTS, "s", "lower")
+
+    # The Stat Interaction tab's 200 x 200 crit/HAC grid
+    x_values, y_values = interaction_range("crit", EXAMPLE_BUILD[5]), interaction_range("hac", EXAMPLE_BUILD[4])
+    results["stat_pair_grid_seconds"] = metric(
+        best_time(lambda: analyze_stat_pair(*EXAMPLE_BUILD, "crit", "hac", x_values, y_values), repeat), "s", "lower"
+    )
+
+    # Top 10 of every combination of the example rune inventory
+    slots, runes = read_rune_catalog()
+    results["explore_runes_seconds"] = metric(
+        best_time(lambda: explore_runes(*EXAMPLE_BUILD, slots, runes, EXPLORE_RUNES), repeat), "s", "lower"
+    )
+
+    # A large optimization written to a result store chunk by chunk, then reopened and ranked from disk
+    store_path = tempfile.mkdtemp()
+    try:
+        def write_store():
+            shutil.rmtree(store_path)
+            return store_stat_allocations(
+                ResultStore(store_path), *EXAMPLE_BUILD[:3], sum(EXAMPLE_BUILD[3:]), [(0, sum(EXAMPLE_BUILD[3:]))] * 3, STORE_STEP
+            )
+        rows = write_store()["candidates"]
+        results["result_store_write_rows_per_second"] = metric(rows / best_time(write_store, repeat), "rows/s", "higher")
+        results["result_store_reopen_seconds"] = metric(
+            best_time(lambda: np.argmax(ResultStore(store_path)["avg_heal"]), repeat), "s", "lower"
+        )
+    finally:
+        shutil.rmtree(store_path, ignore_errors=True)
+
+    seconds = best_time(
+        lambda: simulate_rotation(*EXAMPLE_BUILD, EXAMPLE_ROTATION, ROTATION_SECONDS, ROTATION_ENCOUNTERS, [500000], SEED),
+        repeat
+    )
+    results[f"rotation_{ROTATION_ENCOUNTERS}_encounters_seconds"] = metric(seconds, "s", "lower")
+
+    # plot_stat_curve draws onto whatever canvas it is given, so an Agg canvas renders it headless.
+    # A bare app is enough: it only needs its curve artists and (disabled) stage timings.
+    app = HealCalcApp.__new__(HealCalcApp)
+    app.timings = None
+    app.stat_curves = {}
+    base_min_damage, base_max_damage, skill_heal, sdb, hac, crit = EXAMPLE_BUILD
+    analysis = gui_comparison()[1]
+    refined = analyze_all_stats(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, seed=SEED + 1)
+    moved = analyze_all_stats(base_min_damage, base_max_damage, skill_heal, sdb + 30, hac, crit, seed=SEED)
+
+    def new_figure():
+        figure = Figure(figsize=(5, 4), dpi=100)
+        FigureCanvasAgg(figure)
+        return figure
+
+    def plot(figure, sweep, current_value):
+        HealCalcApp.plot_stat_curve(app, figure, figure.canvas, sweep, "Skill Damage Boost", "sdb", current_value, 3000)
+
+    # First draw of a tab: artists, layout and a full render
+    results["plot_stat_curve_first_seconds"] = metric(
+        best_time(lambda: plot(new_figure(), analysis["sdb"], sdb), repeat), "s", "lower"
+    )
+
+    # New results for the same stat value (a reseed or refinement) only blit the curves
+    figure = new_figure()
+    sweeps = iter([analysis["sdb"], refined["sdb"]] * (repeat + 1))
+    results["plot_stat_curve_update_seconds"] = metric(
+        best_time(lambda: plot(figure, next(sweeps), sdb), repeat), "s", "lower"
+    )
+
+    # A moved stat changes the axes, so the figure is redrawn, but not laid out again
+    sweeps = iter([(analysis["sdb"], sdb), (moved["sdb"], sdb + 30)] * (repeat + 1))
+    results["plot_stat_curve_redraw_seconds"] = metric(
+        best_time(lambda: plot(figure, *next(sweeps)), repeat), "s", "lower"
+    )
+
+    return results
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Rows of (name, baseline, current, change, regressed) for metrics present in both runs"""
+    rows = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["value"], current["value"]
+        change = (new - old) / old if old else 0.0
+        # A regression is a move in the wrong direction by more than the tolerance
+        regressed = change < -tolerance if current["better"] == "higher" else change > tolerance
+        rows.append((name, old, new, change, regressed))
+    return rows
+
+def format_value(value, unit):
+    if unit == "bytes":
+        return f"{value / 2**20:.1f} MB"
+    if unit == "s":
+        return f"{value * 1000:.2f} ms" if value >= 1e-3 else f"{value * 1e6:.1f} us"
+    return f"{value:,.0f} {unit}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulation, sweep and plotting hot paths")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each timing; the fastest is kept")
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown flagged as a regression (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    # With JSON on stdout, the readable report goes to stderr
+    report = sys.stderr if args.output == "-" else sys.stdout
+    results = run_benchmarks(args.repeat)
+    for name, result in results.items():
+        print(f"{name:<45} {format_value(result['value'], result['unit']):>20}", file=report)
+
+    if args.output:
+        document = {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": args.repeat,
+            "results": results
+        }
+        if args.output == "-":
+            json.dump(document, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.output, "w") as file:
+                json.dump(document, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        rows = compare_to_baseline(results, baseline, args.tolerance)
+        print(file=report)
+        print(f"Compared to {args.baseline} (tolerance {args.tolerance:.0%}):", file=report)
+        for name, old, new, change, regressed in rows:
+            unit = results[name]["unit"]
+            flag = "REGRESSION" if regressed else "ok"
+            print(f"{name:<45} {format_value(old, unit):>20} -> {format_value(new, unit):>20} {change:+8.1%}  {flag}", file=report)
+        regressions = sum(regressed for *_, regressed in rows)
+        print(f"{regressions} regressions", file=report)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import sys
+import numpy as np
+from healCalc_engine import calculate_heal
+
+# Builds spanning low/high proc chances and overlapping/disjoint HAC ranges
+BUILDS = [
+    (157, 306, 0.5591, 460, 600, 630),
+    (157, 306, 0.5591, 0, 0, 0),
+    (100, 400, 0.20, 1500, 1000, 3000),
+    (50, 60, 0.0, 3000, 2500, 6000),
+    (300, 300, 1.0, 800, 300, 1200),
+]
+
+def cross_check(trials=1000000, z=4.0, percentile_tolerance=0.01):
+    """Compare the analytic mode against Monte Carlo and return the number of failures"""
+    failures = 0
+
+    for build in BUILDS:
+        exact = calculate_heal(*build, mode="analytic")
+        sampled = calculate_heal(*build, trials=trials)
+        checks = []
+
+        # Mean heal within z standard errors (the heal is bounded by 2 * max_heal)
+        heal_se = 2 * exact["max_heal"] / np.sqrt(trials)
+        checks.append(("avg_heal", exact["avg_heal"], sampled["avg_heal"], z * heal_se))
+
+        # Proc percentages within z binomial standard errors
+        for key in ["crit_percentage", "hac_percentage", "crit_hac_percentage"]:
+            p = exact[key] / 100
+            checks.append((key, exact[key], sampled[key], z * np.sqrt(p * (1 - p) / trials) * 100 + 1e-9))
+
+        # Percentiles within a relative tolerance
+        for level, e, s in zip([5, 50, 95], exact["percentiles"], sampled["percentiles"]):
+            checks.append((f"p{level}", e, s, percentile_tolerance * e))
+
+        print(f"Build {build}")
+        for name, e, s, tolerance in checks:
+            ok = abs(e - s) <= tolerance
+            failures += not ok
+            print(f"    {name:<20} analytic={e:10.2f}  monte_carlo={s:10.2f}  {'ok' if ok else 'MISMATCH'}")
+        print()
+
+    return failures
+
+if __name__ == "__main__":
+    failures = cross_check()
+    print(f"{failures} mismatches")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,1749 @@
+import json
+import math
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+
+# Running (count, mean, M2) moments before any values are seen
+EMPTY_MOMENTS = (0, 0.0, 0.0)
+
+# Bins of the heal histogram over [0, 2 * max_heal] kept by heal summaries
+HISTOGRAM_BINS = 8192
+
+# Trials drawn and evaluated at a time, which bounds memory whatever the trial count
+CHUNK_TRIALS = 65536
+
+# Heals held at once when many builds are simulated side by side
+BATCH_ELEMENTS = 1 << 20
+
+# Casts a rotation may fit into one encounter, which bounds its (encounters x casts) arrays
+MAX_ROTATION_CASTS = 100000
+
+# Damage coefficient and flat bonus of the modelled skill, used by casts and skills that give none
+SKILL_COEFFICIENT = 6.1
+SKILL_FLAT_DAMAGE = 232
+
+# The skill table shipped next to this module
+SKILLS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills.json")
+
+# The example rune inventory, next to this module
+RUNES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runes.json")
+
+def as_seed_sequence(seed):
+    """Fresh SeedSequence for an int seed, None (new entropy) or an existing SeedSequence
+
+    An existing sequence is copied with its spawn counter reset, so spawning
+    from the same seed always yields the same child streams.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key, pool_size=seed.pool_size)
+    return np.random.SeedSequence(seed)
+
+def draw_rolls(trials, seed=None):
+    """Roll, crit and HAC uniforms for every trial, shareable between builds
+
+    Each of the three comes from its own child stream of seed, so drawing fewer
+    trials from the same seed gives a prefix of every array.
+    """
+    return tuple(np.random.default_rng(child).random(trials) for child in as_seed_sequence(seed).spawn(3))
+
+def roll_stream(trials, seed=None, chunk_trials=CHUNK_TRIALS):
+    """Rolls for trials draws, regenerated chunk by chunk from the seed instead of stored
+
+    Every pass over the stream yields the same draws, so builds evaluated on it
+    one after another are still paired, and memory holds one chunk at a time.
+    """
+    return {"trials": trials, "seed": as_seed_sequence(seed), "chunk_trials": chunk_trials}
+
+def iter_rolls(rolls):
+    """Yield the (roll_u, crit_u, hac_u) chunks of a roll stream in order"""
+    seed, chunk_trials = rolls["seed"], rolls["chunk_trials"]
+    for index, start in enumerate(range(0, rolls["trials"], chunk_trials)):
+        # Chunk i always comes from the same child stream, and Generator.random draws in order from
+        # the roll, crit and HAC streams draw_rolls gives it, so a short last chunk holds the first
+        # values of the full-size one. A stream's leading trials therefore do not depend on how many
+        # trials it has in total, and only the trials asked for are drawn.
+        child = np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (index,), pool_size=seed.pool_size)
+        yield draw_rolls(min(chunk_trials, rolls["trials"] - start), child)
+
+def leading_rolls(rolls, trials):
+    """The roll stream cut down to its first trials draws"""
+    return dict(rolls, trials=trials)
+
+def heals_from_rolls(min_heal, max_heal, crit_prob, hac_prob, rolls):
+    """Heals and proc flags of one build evaluated on one chunk of pre-drawn rolls"""
+    roll_u, crit_u, hac_u = rolls
+
+    heal_values = min_heal + (max_heal - min_heal) * roll_u
+    is_crit = crit_u < crit_prob
+    is_hac = hac_u < hac_prob
+
+    heal_values[is_crit] = max_heal  # Crit ensures max heal
+    heal_values[is_hac] *= 2  # Heavy Attack doubles heal
+
+    return heal_values, is_crit, is_hac
+
+def combine_moments(moments, other):
+    """Pool the (count, mean, M2) moments of two disjoint samples"""
+    count, mean, m2 = moments
+    other_count, other_mean, other_m2 = other
+    if other_count == 0:
+        return moments
+
+    # Chan et al. pairwise update, stable for any number of chunks
+    total = count + other_count
+    delta = other_mean - mean
+    return (
+        total,
+        mean + delta * other_count / total,
+        m2 + other_m2 + delta ** 2 * count * other_count / total
+    )
+
+def merge_moments(moments, values):
+    """Fold a chunk of values into running (count, mean, M2) moments"""
+    if len(values) == 0:
+        return moments
+    chunk_mean = values.mean()
+    return combine_moments(moments, (len(values), chunk_mean, ((values - chunk_mean) ** 2).sum()))
+
+def standard_error(moments):
+    """Standard error of the mean of the moments"""
+    count, _, m2 = moments
+    if count < 2:
+        return np.inf
+    return np.sqrt(m2 / (count - 1) / count)
+
+def ci_half_width(moments, z=1.96):
+    """Half-width of the confidence interval on the mean of the moments (95% by default)"""
+    return z * standard_error(moments)
+
+def new_summary(max_heal):
+    """Empty streaming summary of a build's heals: moments, proc counts and a fixed-bin histogram
+
+    Its size does not depend on how many heals are added, so any number of
+    trials can be summarized in the memory of one chunk.
+    """
+    # Heals never exceed 2 * max_heal, so the histogram range is known up front
+    return {
+        "moments": EMPTY_MOMENTS,
+        "crit_count": 0,
+        "hac_count": 0,
+        "crit_hac_count": 0,
+        "histogram": np.zeros(HISTOGRAM_BINS, dtype=np.int64),
+        "histogram_range": (0.0, 2 * max_heal if max_heal > 0 else 1.0)
+    }
+
+def add_to_summary(summary, heal_values, is_crit, is_hac):
+    """Fold one chunk of heals and proc flags into a summary, in place"""
+    low, high = summary["histogram_range"]
+    bins = np.minimum(((heal_values - low) * (HISTOGRAM_BINS / (high - low))).astype(np.intp), HISTOGRAM_BINS - 1)
+
+    summary["moments"] = merge_moments(summary["moments"], heal_values)
+    summary["crit_count"] += np.count_nonzero(is_crit)
+    summary["hac_count"] += np.count_nonzero(is_hac)
+    summary["crit_hac_count"] += np.count_nonzero(is_crit & is_hac)
+    summary["histogram"] += np.bincount(bins, minlength=HISTOGRAM_BINS)
+    return summary
+
+def summarize_rolls(min_heal, max_heal, crit_prob, hac_prob, rolls):
+    """Summary of one build's heals over every chunk of a roll stream"""
+    summary = new_summary(max_heal)
+    for chunk in iter_rolls(rolls):
+        add_to_summary(summary, *heals_from_rolls(min_heal, max_heal, crit_prob, hac_prob, chunk))
+    return summary
+
+def summarize_builds(min_heal, max_heal, crit_prob, hac_prob, rolls):
+    """Moments and proc counts of many builds at once, every build on the same roll stream
+
+    The arguments are arrays with one entry per build. Heals are evaluated a
+    block of builds at a time, so memory stays bounded by BATCH_ELEMENTS.
+    """
+    min_heal, max_heal, crit_prob, hac_prob = (
+        np.asarray(v, dtype=float) for v in np.broadcast_arrays(min_heal, max_heal, crit_prob, hac_prob)
+    )
+    builds = len(min_heal)
+    summary = {
+        "moments": (0, np.zeros(builds), np.zeros(builds)),
+        "crit_count": np.zeros(builds, dtype=np.int64),
+        "hac_count": np.zeros(builds, dtype=np.int64),
+        "crit_hac_count": np.zeros(builds, dtype=np.int64)
+    }
+
+    for roll_u, crit_u, hac_u in iter_rolls(rolls):
+        chunk_mean = np.empty(builds)
+        chunk_m2 = np.empty(builds)
+        width = max(1, BATCH_ELEMENTS // len(roll_u))
+        for start in range(0, builds, width):
+            block = slice(start, start + width)
+            # Same arithmetic as heals_from_rolls, one row per build
+            is_crit = crit_u < crit_prob[block, None]
+            is_hac = hac_u < hac_prob[block, None]
+            heal_values = min_heal[block, None] + (max_heal - min_heal)[block, None] * roll_u
+            heal_values = np.where(is_crit, max_heal[block, None], heal_values)
+            heal_values = np.where(is_hac, heal_values * 2, heal_values)
+
+            chunk_mean[block] = heal_values.mean(axis=1)
+            chunk_m2[block] = ((heal_values - chunk_mean[block, None]) ** 2).sum(axis=1)
+            summary["crit_count"][block] += np.count_nonzero(is_crit, axis=1)
+            summary["hac_count"][block] += np.count_nonzero(is_hac, axis=1)
+            summary["crit_hac_count"][block] += np.count_nonzero(is_crit & is_hac, axis=1)
+
+        summary["moments"] = combine_moments(summary["moments"], (len(roll_u), chunk_mean, chunk_m2))
+
+    return summary
+
+def merge_summaries(summaries):
+    """Combine heal summaries of disjoint trial chunks, in the order given"""
+    merged = dict(summaries[0])
+    for summary in summaries[1:]:
+        merged["moments"] = combine_moments(merged["moments"], summary["moments"])
+        for key in ["crit_count", "hac_count", "crit_hac_count"]:
+            merged[key] = merged[key] + summary[key]
+        merged["histogram"] = merged["histogram"] + summary["histogram"]
+    return merged
+
+def summary_percentiles(summary, q=(5, 50, 95)):
+    """Percentiles interpolated within the bins of a summary's heal histogram"""
+    histogram = summary["histogram"]
+    low, high = summary["histogram_range"]
+    width = (high - low) / len(histogram)
+
+    levels = np.asarray(q, dtype=float) / 100 * histogram.sum()
+    cumulative = np.cumsum(histogram)
+    k = np.minimum(np.searchsorted(cumulative, levels), len(histogram) - 1)
+    before = cumulative[k] - histogram[k]
+    frac = np.where(histogram[k] > 0, (levels - before) / np.maximum(histogram[k], 1), 0.0)
+    return low + (k + frac) * width
+
+def summary_histogram(summary):
+    """(fractions, bin_edges) of a summary's heals, the fixed-size stand-in for the raw distribution"""
+    histogram = summary["histogram"]
+    low, high = summary["histogram_range"]
+    return histogram / max(histogram.sum(), 1), np.linspace(low, high, len(histogram) + 1)
+
+def paired_moments(build, base_build, rolls):
+    """(count, mean, M2) of the per-trial heal difference between two builds on the same rolls"""
+    moments = EMPTY_MOMENTS
+    for chunk in iter_rolls(rolls):
+        difference = heals_from_rolls(*build, chunk)[0] - heals_from_rolls(*base_build, chunk)[0]
+        moments = merge_moments(moments, difference)
+    return moments
+
+def paired_heal_difference(build, base_build, rolls):
+    """Mean heal gain of build over base_build on the same rolls, with its standard error
+
+    Builds are (min_heal, max_heal, crit_prob, hac_prob) tuples. Because both
+    see identical draws, the shared noise cancels out of the per-trial
+    difference and the standard error reflects only the real gap.
+    """
+    moments = paired_moments(build, base_build, rolls)
+    return moments[1], standard_error(moments)
+
+def heal_build(result):
+    """The (min_heal, max_heal, crit_prob, hac_prob) tuple behind a calculate_heal result"""
+    return (result["min_heal"], result["max_heal"], result["crit_maxroll"], result["hac_maxroll"])
+
+def add_paired_gains(results, base_name, rolls, cache=None):
+    """Add each calculate_heal result's paired gain over results[base_name] as gain/gain_se"""
+    # Each build is compared over the leading rolls it was simulated on
+    base_build = heal_build(results[base_name])
+    for data in results.values():
+        build_rolls = leading_rolls(rolls, data["trials"])
+        data["gain"], data["gain_se"] = cached_call(
+            cache, cache_key("gain", heal_build(data), base_build, build_rolls),
+            paired_heal_difference, heal_build(data), base_build, build_rolls
+        )
+
+    return results
+
+def simulate_to_precision(min_heal, max_heal, crit_prob, hac_prob, target_ci, chunk_trials=10000, max_trials=5000000, seed=None):
+    """Summarize chunks of heals until the average heal's 95% CI half-width is within target_ci
+
+    Precision is checked after every chunk of chunk_trials (at most
+    CHUNK_TRIALS), so low-variance builds stop after the first one and no
+    build goes past max_trials. Only the running summary is kept.
+    """
+    summary = new_summary(max_heal)
+    rolls = roll_stream(max_trials, seed, min(chunk_trials, CHUNK_TRIALS))
+
+    for chunk in iter_rolls(rolls):
+        add_to_summary(summary, *heals_from_rolls(min_heal, max_heal, crit_prob, hac_prob, chunk))
+        if ci_half_width(summary["moments"]) <= target_ci:
+            break
+
+    return summary
+
+def paired_rolls_to_precision(builds, base_build, target_ci, chunk_trials=10000, max_trials=5000000, seed=None):
+    """Grow one shared roll stream until every build's gain over base_build is within target_ci
+
+    Returns the roll stream and, for each build, how many leading trials it
+    needed. Builds whose gain is clear stop early, while close calls keep
+    sampling; calculate_heal on that many leading rolls then reproduces the estimate.
+    """
+    rolls = roll_stream(max_trials, seed, min(chunk_trials, CHUNK_TRIALS))
+    moments = [EMPTY_MOMENTS for _ in builds]
+    needed = [None] * len(builds)
+    total = 0
+
+    for chunk in iter_rolls(rolls):
+        total += len(chunk[0])
+        base_heals = heals_from_rolls(*base_build, chunk)[0]
+
+        for i, build in enumerate(builds):
+            if needed[i] is not None:
+                continue
+            difference = heals_from_rolls(*build, chunk)[0] - base_heals
+            moments[i] = merge_moments(moments[i], difference)
+            if ci_half_width(moments[i]) <= target_ci:
+                needed[i] = total
+
+        if all(n is not None for n in needed):
+            break
+
+    needed = [total if n is None else n for n in needed]
+    return leading_rolls(rolls, total), needed
+
+def paired_comparison_rolls(exact_results, base_name, trials, target_ci=None, max_trials=5000000, seed=None):
+    """Shared roll stream for a paired comparison and the number of leading trials each build uses
+
+    exact_results maps build names to analytic calculate_heal results. Without
+    a target every build uses the same trials draws; with one, trials is the
+    chunk size and the stream grows until each gain over base_name is within
+    target_ci.
+    """
+    if target_ci is None:
+        return roll_stream(trials, seed), {name: trials for name in exact_results}
+
+    names = [name for name in exact_results if name != base_name]
+    rolls, needed = paired_rolls_to_precision(
+        [heal_build(exact_results[name]) for name in names],
+        heal_build(exact_results[base_name]),
+        target_ci, trials, max_trials, seed
+    )
+    build_trials = dict(zip(names, needed))
+    build_trials[base_name] = rolls["trials"]
+    return rolls, build_trials
+
+def heal_cdf(x, min_heal, max_heal, crit_prob, hac_prob):
+    """Exact probability that a single cast heals for at most x, element-wise over arrays of builds"""
+    x = np.asarray(x, dtype=float)
+    span = np.asarray(max_heal - min_heal, dtype=float)
+
+    # Uniform roll CDF, a single atom when the roll range is degenerate
+    def uniform_cdf(v):
+        ramp = np.clip((v - min_heal) / np.where(span > 0, span, 1.0), 0.0, 1.0)
+        return np.where(span > 0, ramp, v >= min_heal)
+
+    return (
+        (1 - crit_prob) * (1 - hac_prob) * uniform_cdf(x)
+        + crit_prob * (1 - hac_prob) * (x >= max_heal)
+        + (1 - crit_prob) * hac_prob * uniform_cdf(x / 2)
+        + crit_prob * hac_prob * (x >= 2 * max_heal)
+    )
+
+def heal_quantiles(q, min_heal, max_heal, crit_prob, hac_prob):
+    """Invert the mixture CDF exactly for the quantile levels q (0-100)
+
+    The build arguments may be arrays, giving one row of quantiles per build.
+    """
+    levels = np.asarray(q, dtype=float) / 100
+    build = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (min_heal, max_heal, crit_prob, hac_prob)))
+    min_heal, max_heal = build[:2]
+
+    # The CDF is linear between these points, with jumps at the crit atoms
+    knots = np.sort(np.stack([min_heal, max_heal, 2 * min_heal, 2 * max_heal], axis=-1), axis=-1)
+    per_knot = [v[..., None] for v in build]
+    cdf_at = heal_cdf(knots, *per_knot)
+    cdf_before = heal_cdf(np.nextafter(knots, -np.inf), *per_knot)
+
+    def at(values, index):
+        return np.take_along_axis(values, index[..., None], axis=-1)[..., 0]
+
+    quantiles = []
+    for level in levels:
+        # First knot whose CDF (including its atom) reaches the level
+        k = np.minimum((cdf_at < level).sum(axis=-1), knots.shape[-1] - 1)
+        previous = np.maximum(k - 1, 0)
+
+        # Linear piece between the previous knot and this one, unless the level falls in the atom
+        span = at(cdf_before, k) - at(cdf_at, previous)
+        frac = np.where(span > 0, (level - at(cdf_at, previous)) / np.where(span > 0, span, 1.0), 1.0)
+        linear = at(knots, previous) + frac * (at(knots, k) - at(knots, previous))
+        quantiles.append(np.where((k == 0) | (level >= at(cdf_before, k)), at(knots, k), linear))
+
+    return np.stack(quantiles, axis=-1)
+
+def analytic_avg_heal(min_heal, max_heal, crit_prob, hac_prob):
+    """Exact expected heal, element-wise over arrays of builds"""
+    mean_roll = (min_heal + max_heal) / 2
+
+    # Each crit/HAC outcome weighted by its probability
+    return (
+        (1 - crit_prob) * (1 - hac_prob) * mean_roll
+        + crit_prob * (1 - hac_prob) * max_heal
+        + (1 - crit_prob) * hac_prob * 2 * mean_roll
+        + crit_prob * hac_prob * 2 * max_heal
+    )
+
+def analytic_heal_stats(min_heal, max_heal, crit_prob, hac_prob, percentiles=(5, 50, 95)):
+    """Exact mean, percentiles and proc percentages of the heal mixture"""
+    return {
+        "avg_heal": analytic_avg_heal(min_heal, max_heal, crit_prob, hac_prob),
+        "percentiles": heal_quantiles(percentiles, min_heal, max_heal, crit_prob, hac_prob),
+        "crit_percentage": crit_prob * 100,
+        "hac_percentage": hac_prob * 100,
+        "crit_hac_percentage": crit_prob * hac_prob * 100
+    }
+
+def analytic_histogram(min_heal, max_heal, crit_prob, hac_prob):
+    """Exact (fractions, bin_edges) of the heal mixture on the same bins as summary_histogram"""
+    edges = np.linspace(0.0, 2 * max_heal if max_heal > 0 else 1.0, HISTOGRAM_BINS + 1)
+
+    # Bins are [low, high) like the simulated ones, so an atom on an edge lands in the bin above it
+    below = heal_cdf(np.nextafter(edges, -np.inf), min_heal, max_heal, crit_prob, hac_prob)
+    below[-1] = 1.0
+    return np.diff(below), edges
+
+def analytic_heal_std(min_heal, max_heal, crit_prob, hac_prob):
+    """Exact standard deviation of a single cast's heal, element-wise over arrays of builds"""
+    # The heal is (the roll, or max_heal on a crit) doubled on an independent HAC
+    mean_roll = (min_heal + max_heal) / 2
+    mean_roll_squared = (min_heal ** 2 + min_heal * max_heal + max_heal ** 2) / 3
+    mean = ((1 - crit_prob) * mean_roll + crit_prob * max_heal) * (1 + hac_prob)
+    mean_squared = ((1 - crit_prob) * mean_roll_squared + crit_prob * max_heal ** 2) * (1 + 3 * hac_prob)
+    return np.sqrt(np.maximum(mean_squared - mean ** 2, 0.0))
+
+def stat_allocations(budget, bounds, step):
+    """Every (sdb, hac, crit) split of budget on a grid of about step, within per-stat (min, max) bounds
+
+    The grid divides the budget evenly, so all three stats land on it and the
+    whole budget is always spent. Returns three flat arrays, one entry per
+    allocation, and the exact grid spacing used.
+    """
+    units = max(1, int(round(budget / step)))
+    spacing = budget / units
+
+    # SDB and HAC take every pair of unit counts that leaves crit a non-negative share
+    sdb_units, hac_units = np.triu_indices(units + 1)
+    hac_units = hac_units - sdb_units
+    sdb = sdb_units * spacing
+    hac = hac_units * spacing
+    crit = (units - sdb_units - hac_units) * spacing
+
+    valid = np.ones(len(sdb), dtype=bool)
+    for values, (low, high) in zip([sdb, hac, crit], bounds):
+        valid &= (values >= low - 1e-9) & (values <= high + 1e-9)
+    return sdb[valid], hac[valid], crit[valid], spacing
+
+def pareto_frontier(values, risks):
+    """Indices of the points that no other point beats with a higher value at no more risk, by increasing risk"""
+    # Sort by risk (higher value first on ties) and keep each new best value
+    order = np.lexsort((-values, risks))
+    best_before = np.concatenate(([-np.inf], np.maximum.accumulate(values[order])[:-1]))
+    return order[values[order] > best_before]
+
+def optimize_stat_budget(evaluate, budget, bounds, step=None):
+    """Best SDB/HAC/crit split of a stat budget, with the avg heal vs spread Pareto frontier
+
+    evaluate(sdb, hac, crit) returns the average heal and its standard
+    deviation for arrays of allocations, so every candidate is scored in one
+    vectorized call. The default step gives a grid of about 31,000 splits.
+    """
+    if step is None:
+        step = budget / 250
+    sdb, hac, crit, step = stat_allocations(budget, bounds, step)
+    if len(sdb) == 0:
+        raise ValueError("No allocation of the budget fits within the stat bounds")
+    avg_heal, std_heal = evaluate(sdb, hac, crit)
+    return budget_optimization(budget, step, {"sdb": sdb, "hac": hac, "crit": crit, "avg_heal": avg_heal, "std_heal": std_heal})
+
+def budget_optimization(budget, step, points):
+    """optimize_stat_budget's result from the scored splits, in memory or in a ResultStore"""
+    avg_heal, std_heal = points["avg_heal"], points["std_heal"]
+
+    def allocation(i):
+        return {stat: points[stat][i] for stat in ["sdb", "hac", "crit", "avg_heal", "std_heal"]}
+
+    return {
+        "budget": budget,
+        "step": step,
+        "candidates": len(avg_heal),
+        "best": allocation(np.argmax(avg_heal)),
+        "frontier": [allocation(i) for i in pareto_frontier(avg_heal, std_heal)],
+        "points": points
+    }
+
+def _sums_below(thresholds, keys, weights):
+    """Sum of the weights whose key is below each threshold, from one sort and a prefix sum"""
+    order = np.argsort(keys)
+    prefix = np.concatenate(([0.0], np.cumsum(weights[order])))
+    return prefix[np.searchsorted(keys[order], thresholds)]
+
+def _sweep_heal_sum(min_heal, max_heal, crit_prob, hac_prob, rolls):
+    """Total heal at every sweep point over one chunk of rolls"""
+    roll_u, crit_u, hac_u = rolls
+    trials = len(roll_u)
+
+    # A heal is min_heal + (max_heal - min_heal) * weight, doubled on HAC, where the
+    # weight is the uniform roll, or 1 on a crit. Summing the two factors over the
+    # trials gives the total at any heal range.
+    if hac_prob.size > 1:
+        is_crit = crit_u < crit_prob
+        weight = np.where(is_crit, 1.0, roll_u)
+        hac_trials = _sums_below(hac_prob, hac_u, np.ones(trials))
+        hac_weight = _sums_below(hac_prob, hac_u, weight)
+        base_sum = trials + hac_trials
+        roll_sum = weight.sum() + hac_weight
+    else:
+        is_hac = hac_u < hac_prob
+        multiplier = np.where(is_hac, 2.0, 1.0)
+        crit_weight = _sums_below(crit_prob, crit_u, (1 - roll_u) * multiplier)
+        base_sum = multiplier.sum()
+        roll_sum = (roll_u * multiplier).sum() + crit_weight
+
+    return min_heal * base_sum + (max_heal - min_heal) * roll_sum
+
+def sweep_avg_heal(min_heal, max_heal, crit_prob, hac_prob, rolls):
+    """Monte Carlo average heal at every sweep point, all evaluated on the same roll stream
+
+    The arguments broadcast against each other, but only one of crit_prob and
+    hac_prob may vary across points. Each point gives exactly what simulating it
+    on these rolls would, yet the cost grows with the trial count, not with
+    trials times points.
+    """
+    crit_prob = np.asarray(crit_prob, dtype=float)
+    hac_prob = np.asarray(hac_prob, dtype=float)
+    if crit_prob.size > 1 and hac_prob.size > 1:
+        raise ValueError("Only one of crit_prob and hac_prob can vary across sweep points")
+
+    total = sum(_sweep_heal_sum(min_heal, max_heal, crit_prob, hac_prob, chunk) for chunk in iter_rolls(rolls))
+    return total / max(rolls["trials"], 1)
+
+def split_trials(trials, workers):
+    """Trial counts per worker, as even as possible and always in the same order"""
+    base, extra = divmod(trials, workers)
+    return [base + (1 if i < extra else 0) for i in range(workers)]
+
+_pools = {}
+
+def get_pool(workers):
+    """Process pool with the given number of workers, created once and then reused"""
+    if workers not in _pools:
+        # Imported here so single-process runs start without the multiprocessing machinery
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Spawned workers start a fresh interpreter that re-imports the parent's __main__ (the GUI
+        # with tkinter, or the user's script), so that script must guard its entry point
+        _pools[workers] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    return _pools[workers]
+
+def run_trial_chunks(task, trials, seed=None, workers=1, *args):
+    """Run task(*args, rolls) on a roll stream for each worker's share of the trials
+
+    Each share gets its own SeedSequence.spawn child stream and results come
+    back in share order, so merging them is bit-reproducible for a given seed
+    and worker count. One worker runs in-process.
+
+    More workers run in spawned processes, which re-import the main script.
+    A script calling any workers > 1 API must do so under
+    `if __name__ == "__main__":`, or the pool fails with BrokenProcessPool.
+    """
+    children = as_seed_sequence(seed).spawn(workers)
+    streams = [roll_stream(size, child) for size, child in zip(split_trials(trials, workers), children)]
+    if workers == 1:
+        return [task(*args, streams[0])]
+
+    pool = get_pool(workers)
+    futures = [pool.submit(task, *args, rolls) for rolls in streams]
+    return [future.result() for future in futures]
+
+def _sweep_chunk(sweeps, rolls):
+    return [sweep_avg_heal(*sweep, rolls) for sweep in sweeps]
+
+def parallel_heal_summary(min_heal, max_heal, crit_prob, hac_prob, trials, seed=None, workers=1):
+    """Heal summary of one build with its trials split across worker processes
+
+    The caller's script needs a main guard, see run_trial_chunks.
+    """
+    summaries = run_trial_chunks(summarize_rolls, trials, seed, workers, min_heal, max_heal, crit_prob, hac_prob)
+    return merge_summaries(summaries)
+
+def parallel_paired_difference(build, base_build, trials, seed=None, workers=1):
+    """paired_heal_difference across worker processes
+
+    Pass the seed the two builds were simulated with to pair on the same draws.
+    The caller's script needs a main guard, see run_trial_chunks.
+    """
+    moments = EMPTY_MOMENTS
+    for chunk_moments in run_trial_chunks(paired_moments, trials, seed, workers, build, base_build):
+        moments = combine_moments(moments, chunk_moments)
+    return moments[1], standard_error(moments)
+
+def parallel_sweep_avg_heal(sweeps, trials, seed=None, workers=1):
+    """sweep_avg_heal for several (min_heal, max_heal, crit_prob, hac_prob) sweeps across worker processes
+
+    The caller's script needs a main guard, see run_trial_chunks.
+    """
+    sizes = split_trials(trials, workers)
+    chunks = run_trial_chunks(_sweep_chunk, trials, seed, workers, sweeps)
+
+    # Each chunk's averages weighted by its share of the trials
+    return [
+        sum(size * chunk[i] for size, chunk in zip(sizes, chunks)) / trials
+        for i in range(len(sweeps))
+    ]
+
+def cache_key(*parts):
+    """Hashable, normalized cache key from numbers, strings, seeds, roll streams and tuples of them
+
+    Floats are rounded so that the same build typed two ways (460 and 460.0,
+    or a sum with rounding noise) maps to the same key.
+    """
+    key = []
+    for part in parts:
+        if isinstance(part, np.random.SeedSequence):
+            key.append(("seed", part.entropy, part.spawn_key))
+        elif isinstance(part, dict):
+            # A roll stream is identified by the draws it yields
+            key.append(("rolls", part["trials"], part["chunk_trials"]) + cache_key(part["seed"]))
+        elif isinstance(part, (tuple, list)):
+            key.append(cache_key(*part))
+        elif isinstance(part, (float, np.floating)):
+            key.append(round(float(part), 9))
+        elif isinstance(part, np.integer):
+            key.append(int(part))
+        else:
+            key.append(part)
+    return tuple(key)
+
+class ResultCache:
+    """Bounded LRU of computed results, optionally persisted to a file between sessions
+
+    Counts hits and misses. The on-disk store is a snapshot of the in-memory
+    entries, so it never holds more than maxsize results either. Safe to use
+    from the calculation thread while the UI thread reads the counters.
+    """
+    def __init__(self, maxsize=256, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        if path is not None:
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        """Cached value for key, marking it most recently used"""
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entries beyond maxsize"""
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def load(self):
+        """Merge the entries saved at path into the cache; a missing or unreadable file is ignored"""
+        try:
+            with open(self.path, "rb") as f:
+                saved = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return
+        for key, value in saved.items():
+            if key not in self.entries:
+                self.put(key, value)
+
+    def save(self):
+        """Write the entries to path, replacing the previous snapshot in one step"""
+        if self.path is None:
+            return
+        with self.lock:
+            entries = OrderedDict(self.entries)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+
+class ResultStore:
+    """Columnar results on disk, appended chunk by chunk and reopened as memory maps
+
+    The store is a directory holding one raw file per field and manifest.json,
+    which names the fields' dtypes, the job that writes the store (meta) and
+    how many rows are complete. A chunk only counts once every column is on
+    disk and the manifest has been replaced, so a job that dies mid-chunk
+    resumes from the last completed one. Columns are read back as read-only
+    np.memmap views, so reopening is instant and a query only pages in the
+    columns it touches. Fields must be numeric.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.manifest_path = os.path.join(path, "manifest.json")
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = {"meta": None, "rows": 0, "chunks": 0, "fields": {}}
+        self.meta = manifest["meta"]
+        self.rows = manifest["rows"]
+        self.chunks = manifest["chunks"]
+        self.fields = {name: np.dtype(dtype) for name, dtype in manifest["fields"].items()}
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def column(self, name):
+        """Read-only memory map of the completed rows of field name"""
+        if name not in self.fields:
+            raise KeyError(name)
+        if self.rows == 0:
+            return np.empty(0, dtype=self.fields[name])
+        return np.memmap(self.column_path(name), dtype=self.fields[name], mode="r", shape=(self.rows,))
+
+    def start(self, meta):
+        """Get the store ready for the job described by meta, returning the rows it already holds
+
+        A new store takes on meta. An existing one must have been written by the
+        same job, and loses whatever a crashed run left after its last completed chunk.
+        """
+        meta = json.loads(json.dumps(meta))  # Compared as it will read back from the manifest
+        if self.meta is not None and self.meta != meta:
+            raise ValueError(f"{self.path} holds results of a different job: {self.meta}")
+        os.makedirs(self.path, exist_ok=True)
+        for name, dtype in self.fields.items():
+            with open(self.column_path(name), "ab") as f:
+                f.truncate(self.rows * dtype.itemsize)
+        self.meta = meta
+        self.save_manifest()
+        return self.rows
+
+    def append(self, columns):
+        """Add one chunk from a record array or {field: column}, then mark it complete"""
+        names = list(columns.dtype.names if isinstance(columns, np.ndarray) else columns)
+        if not self.fields:
+            self.fields = {name: np.asarray(columns[name]).dtype for name in names}
+        elif names != list(self.fields):
+            raise ValueError(f"chunk fields {names} do not match the store's {list(self.fields)}")
+        rows = len(columns[names[0]])
+        for name, dtype in self.fields.items():
+            with open(self.column_path(name), "ab") as f:
+                np.ascontiguousarray(columns[name], dtype=dtype).tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        self.rows += rows
+        self.chunks += 1
+        self.save_manifest()
+
+    def save_manifest(self):
+        """Write the manifest, replacing the previous one in one step"""
+        manifest = {
+            "meta": self.meta,
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "fields": {name: dtype.str for name, dtype in self.fields.items()}
+        }
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+_MISSING = object()
+
+def cached_call(cache, key, function, *args):
+    """function(*args), looked up in and stored to cache under key when there is a cache"""
+    if cache is None:
+        return function(*args)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = function(*args)
+        cache.put(key, value)
+    return value
+
+class StageTimings:
+    """Opt-in wall-clock time per named stage, plus counters such as trials simulated
+
+    Stages record their calls, total and slowest seconds. Like ResultCache it
+    is shared by the calculation thread and the UI thread, so updates are locked.
+    """
+    def __init__(self):
+        self.stages = OrderedDict()
+        self.counters = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, name, seconds):
+        """Record one call of stage name that took seconds"""
+        with self.lock:
+            stage = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+            stage["calls"] += 1
+            stage["seconds"] += seconds
+            stage["max_seconds"] = max(stage["max_seconds"], seconds)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def clear(self):
+        with self.lock:
+            self.stages.clear()
+            self.counters.clear()
+
+    def report(self):
+        """JSON-ready copy of the stages and counters"""
+        with self.lock:
+            return {
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+                "counters": dict(self.counters)
+            }
+
+@contextmanager
+def timed(timings, name):
+    """Time the with block as stage name when there are timings; otherwise do nothing"""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+def count_event(timings, name, amount=1):
+    """Add amount to counter name when there are timings"""
+    if timings is not None:
+        timings.count(name, amount)
+
+def format_timings(report):
+    """Text table of a StageTimings report, stages in the order they first ran"""
+    lines = [f"{'Stage':<36}{'Calls':>7}{'Total ms':>12}{'Mean ms':>11}{'Max ms':>11}"]
+    for name, stage in report["stages"].items():
+        mean = stage["seconds"] / stage["calls"]
+        lines.append(
+            f"{name:<36}{stage['calls']:>7}{stage['seconds'] * 1000:>12.1f}{mean * 1000:>11.1f}{stage['max_seconds'] * 1000:>11.1f}"
+        )
+    if report["counters"]:
+        lines.append("")
+        for name, value in report["counters"].items():
+            lines.append(f"{name:<36}{value:>14,}")
+    return "\n".join(lines)
+
+class HealResult:
+    """calculate_heal's statistics for one build, in slots rather than a per-call dict
+
+    Fields are read as attributes or, for code written against the old dicts,
+    by key: result["avg_heal"], "gain" in result, dict(result) and as_dict()
+    all work. gain and gain_se only exist once a comparison has set them.
+    """
+    __slots__ = (
+        "avg_heal", "min_heal", "max_heal", "percentiles", "sdb_maxroll", "crit_maxroll", "hac_maxroll", "crit_percentage",
+        "hac_percentage", "crit_hac_percentage", "histogram", "sdb", "hac", "crit", "trials", "avg_heal_ci", "gain", "gain_se"
+    )
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def keys(self):
+        return [name for name in self.__slots__ if hasattr(self, name)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __contains__(self, name):
+        return name in self.__slots__ and hasattr(self, name)
+
+    def __getitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        if name not in self.__slots__:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def values(self):
+        return [getattr(self, name) for name in self.keys()]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.keys()]
+
+    def as_dict(self):
+        """The result as the plain dict calculate_heal used to return"""
+        return dict(self.items())
+
+    def copy(self):
+        return HealResult(**self.as_dict())
+
+    def __getstate__(self):
+        return self.as_dict()
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"HealResult({', '.join(f'{name}={value!r}' for name, value in self.items() if name != 'histogram')})"
+
+def result_records(columns):
+    """NumPy record array of equal-length result columns, one record per build
+
+    Columns are stored side by side in one buffer, so results["avg_heal"] (or
+    results.avg_heal) is a view for plotting or export, and results[i] reads a
+    single build by field name like the dicts it replaces.
+    """
+    names = list(columns)
+    arrays = np.broadcast_arrays(*(np.asarray(columns[name]) for name in names))
+    return np.rec.fromarrays([np.array(array) for array in arrays], names=names)
+
+def record_dict(record):
+    """Plain {field: Python value} dict of one record, for JSON and other dict consumers"""
+    return dict(zip(record.dtype.names, record.tolist()))
+
+def records_as_dicts(records):
+    """record_dict of every record of a record array"""
+    return [dict(zip(records.dtype.names, row)) for row in records.tolist()]
+
+def maxroll_curve(value, factor):
+    return value / (value + factor)
+
+def maxroll_slope(value, factor):
+    """Derivative of maxroll_curve with respect to the stat value"""
+    return factor / (value + factor) ** 2
+
+def heal_gradient(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit):
+    """Exact d(avg_heal)/d(stat) for SDB, HAC and crit, element-wise over arrays of stats
+
+    The average heal factors as (1 + HAC%) * ((1 - crit%) * mean_roll + crit% * max_heal),
+    with both heal values proportional to (1 + SDB%), so each partial derivative
+    is closed-form. Returns {stat: heal per stat point}.
+    """
+    effective_sdb = maxroll_curve(sdb, 3000)
+    crit_prob = maxroll_curve(crit, 6000)
+    hac_prob = maxroll_curve(hac, 1000)
+
+    scale = (1 + effective_sdb) * (1 + skill_heal)
+    mean_roll = ((base_min_damage + base_max_damage) / 2 * SKILL_COEFFICIENT + SKILL_FLAT_DAMAGE) * scale
+    max_heal = (base_max_damage * SKILL_COEFFICIENT + SKILL_FLAT_DAMAGE) * scale
+    # Average heal before Heavy Attack doubles some of it
+    single_heal = (1 - crit_prob) * mean_roll + crit_prob * max_heal
+
+    return {
+        "sdb": (1 + hac_prob) * single_heal / (1 + effective_sdb) * maxroll_slope(sdb, 3000),
+        "hac": single_heal * maxroll_slope(hac, 1000),
+        "crit": (1 + hac_prob) * (max_heal - mean_roll) * maxroll_slope(crit, 6000)
+    }
+
+def calculate_heal(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, trials=10000, mode="monte_carlo", rolls=None, target_ci=None, max_trials=5000000, seed=None, workers=1, cache=None, timings=None):
+    """Heal statistics of one build, exact or simulated, as a HealResult
+
+    With workers > 1 the trials run in spawned processes, so call it under an
+    `if __name__ == "__main__":` guard (see run_trial_chunks).
+    """
+    # Reproducible calls are served from the cache; unseeded Monte Carlo draws never repeat
+    if cache is not None and (mode == "analytic" or seed is not None or rolls is not None):
+        draws = () if mode == "analytic" else (trials, rolls if rolls is not None else seed, target_ci, max_trials, workers)
+        # Callers add gains to their copy; heal_result names the HealResult layout, so saved dicts are not reused
+        key = cache_key("heal_result", base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, mode, draws)
+        return cached_call(
+            cache, key, calculate_heal, base_min_damage, base_max_damage, skill_heal, sdb, hac, crit,
+            trials, mode, rolls, target_ci, max_trials, seed, workers, None, timings
+        ).copy()
+
+    # Compute effective multipliers using maxroll returns
+    effective_sdb = maxroll_curve(sdb, 3000)
+    effective_crit = maxroll_curve(crit, 6000)
+    effective_hac = maxroll_curve(hac, 1000)
+
+    # Compute skill damage range
+    min_skill_damage = (base_min_damage * SKILL_COEFFICIENT) + SKILL_FLAT_DAMAGE
+    max_skill_damage = (base_max_damage * SKILL_COEFFICIENT) + SKILL_FLAT_DAMAGE
+
+    # Compute healing range
+    min_heal = min_skill_damage * (1 + effective_sdb) * (1 + skill_heal)
+    max_heal = max_skill_damage * (1 + effective_sdb) * (1 + skill_heal)
+
+    # Compute probabilities
+    crit_prob = effective_crit
+    hac_prob = effective_hac
+
+    if mode == "analytic":
+        # Exact closed-form statistics of the crit/HAC mixture, no sampling
+        stats = analytic_heal_stats(min_heal, max_heal, crit_prob, hac_prob)
+        avg_heal = stats["avg_heal"]
+        percentiles = stats["percentiles"]
+        crit_percentage = stats["crit_percentage"]
+        hac_percentage = stats["hac_percentage"]
+        crit_hac_percentage = stats["crit_hac_percentage"]
+        avg_heal_ci = 0.0
+        histogram = analytic_histogram(min_heal, max_heal, crit_prob, hac_prob)
+        trials = 0
+    else:
+        # Monte Carlo Simulation, streamed through a fixed-size summary chunk by chunk
+        if rolls is not None:
+            # Shared rolls pair this build with every other build simulated on them
+            summary = summarize_rolls(min_heal, max_heal, crit_prob, hac_prob, rolls)
+        elif target_ci is not None:
+            # Trials is the chunk size; keep simulating until avg_heal is within target_ci
+            summary = simulate_to_precision(min_heal, max_heal, crit_prob, hac_prob, target_ci, trials, max_trials, seed)
+        elif workers > 1:
+            # Split the trials across processes and merge their summaries
+            summary = parallel_heal_summary(min_heal, max_heal, crit_prob, hac_prob, trials, seed, workers)
+        else:
+            summary = summarize_rolls(min_heal, max_heal, crit_prob, hac_prob, roll_stream(trials, seed))
+
+        percentiles = summary_percentiles(summary)
+        histogram = summary_histogram(summary)  # Fixed-size (fractions, bin_edges), not every heal
+
+        trials, avg_heal, _ = summary["moments"]
+        avg_heal_ci = ci_half_width(summary["moments"])
+        count_event(timings, "trials simulated", trials)
+        crit_percentage = (summary["crit_count"] / trials) * 100
+        hac_percentage = (summary["hac_count"] / trials) * 100
+        crit_hac_percentage = (summary["crit_hac_count"] / trials) * 100
+
+    return HealResult(
+        avg_heal=avg_heal,
+        min_heal=min_heal,
+        max_heal=max_heal,
+        percentiles=percentiles,
+        sdb_maxroll=effective_sdb,
+        crit_maxroll=effective_crit,
+        hac_maxroll=effective_hac,
+        crit_percentage=crit_percentage,
+        hac_percentage=hac_percentage,
+        crit_hac_percentage=crit_hac_percentage,
+        histogram=histogram,
+        sdb=sdb,
+        hac=hac,
+        crit=crit,
+        trials=trials,
+        avg_heal_ci=avg_heal_ci
+    )
+
+def analyze_stat_effectiveness(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, stat_to_analyze, range_points=20, trials=10000, mode="monte_carlo", rolls=None, seed=None, workers=1, timings=None):
+    """Analyze how effective adding more of a stat would be from current value
+
+    Returns a record array with value, avg_heal, <stat>_maxroll and marginal_heal per point.
+    workers > 1 needs a main-guarded caller, see run_trial_chunks.
+    """
+    current_stats = {"sdb": sdb, "hac": hac, "crit": crit}
+
+    # Define ranges based on which stat we're analyzing
+    if stat_to_analyze == "sdb":
+        # Analyze -300 to +300 from current SDB
+        stat_range = np.linspace(max(0, sdb - 300), sdb + 300, range_points)
+    elif stat_to_analyze == "hac":
+        # Analyze -300 to +300 from current HAC
+        stat_range = np.linspace(max(0, hac - 300), hac + 300, range_points)
+    elif stat_to_analyze == "crit":
+        # Analyze -300 to +300 from current crit
+        stat_range = np.linspace(max(0, crit - 300), crit + 300, range_points)
+
+    # Evaluate every point of the range at once, with the analyzed stat as an array
+    sweep_stats = current_stats.copy()
+    sweep_stats[stat_to_analyze] = stat_range
+
+    effective = {
+        "sdb": maxroll_curve(sweep_stats["sdb"], 3000),
+        "crit": maxroll_curve(sweep_stats["crit"], 6000),
+        "hac": maxroll_curve(sweep_stats["hac"], 1000)
+    }
+
+    scale = (1 + effective["sdb"]) * (1 + skill_heal)
+    min_heal = ((base_min_damage * SKILL_COEFFICIENT) + SKILL_FLAT_DAMAGE) * scale
+    max_heal = ((base_max_damage * SKILL_COEFFICIENT) + SKILL_FLAT_DAMAGE) * scale
+
+    if mode == "analytic":
+        avg_heals = analytic_avg_heal(min_heal, max_heal, effective["crit"], effective["hac"])
+    elif rolls is None and workers > 1:
+        # Each process sweeps its own share of the trials; the seed fixes the draws
+        sweep = (min_heal, max_heal, effective["crit"], effective["hac"])
+        avg_heals = parallel_sweep_avg_heal([sweep], trials, seed, workers)[0]
+        count_event(timings, "trials simulated", trials)
+    else:
+        # All points share one set of draws, so the curve only moves with the stat
+        if rolls is None:
+            rolls = roll_stream(trials, seed)
+        avg_heals = sweep_avg_heal(min_heal, max_heal, effective["crit"], effective["hac"], rolls)
+        count_event(timings, "trials simulated", rolls["trials"])
+
+    avg_heals = np.broadcast_to(avg_heals, stat_range.shape)
+    maxrolls = np.broadcast_to(effective[stat_to_analyze], stat_range.shape)
+    # Heal per stat point comes from the exact derivative even when the curve is sampled,
+    # so it is smooth whatever the trial count
+    marginal_heals = heal_gradient(
+        base_min_damage, base_max_damage, skill_heal, sweep_stats["sdb"], sweep_stats["hac"], sweep_stats["crit"]
+    )[stat_to_analyze]
+
+    # One record per point; plots take whole columns (analysis["avg_heal"]) without copying
+    return result_records({
+        "value": stat_range,
+        "avg_heal": avg_heals,
+        f"{stat_to_analyze}_maxroll": maxrolls,
+        "marginal_heal": marginal_heals
+    })
+
+def iter_stat_sweeps(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, stats=("sdb", "hac", "crit"), range_points=20, trials=10000, mode="monte_carlo", seed=None, workers=1, cache=None, timings=None):
+    """Yield (stat, analysis) for each of stats in order, reusing one set of random draws for every point
+
+    Callers that show one curve at a time can put it first and stop early.
+    workers > 1 needs a main-guarded caller, see run_trial_chunks.
+    """
+    seed_sequence = as_seed_sequence(seed)
+    rolls = None
+    if mode == "monte_carlo" and workers == 1:
+        rolls = roll_stream(trials, seed_sequence)
+
+    # Sweeps of the same build and seed repeat exactly, so they are reused whole.
+    # Fresh random draws never repeat, so those are not cached. The key's tag names
+    # the result layout, so sweeps saved as lists of dicts are not reused.
+    if mode == "monte_carlo" and seed is None:
+        cache = None
+    draws = () if mode == "analytic" else (trials, seed_sequence, workers)
+
+    # With several workers each stat is swept in the pool from the same seed, so the draws still match
+    for stat in stats:
+        with timed(timings, f"sweep: {stat}"):
+            analysis = cached_call(
+                cache, cache_key("stat_sweep_records", stat, base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, range_points, mode, draws),
+                analyze_stat_effectiveness, base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, stat, range_points,
+                trials, mode, rolls, seed_sequence, workers, timings
+            )
+        yield stat, analysis
+
+def analyze_all_stats(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, range_points=20, trials=10000, mode="monte_carlo", seed=None, workers=1, cache=None, timings=None):
+    """iter_stat_sweeps's SDB, HAC and crit sweeps at once, as {stat: analysis}
+
+    workers > 1 needs a main-guarded caller, see run_trial_chunks.
+    """
+    return dict(iter_stat_sweeps(
+        base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, ("sdb", "hac", "crit"), range_points, trials,
+        mode, seed, workers, cache, timings
+    ))
+
+def heal_moments(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit):
+    """Exact average heal and its standard deviation, element-wise over arrays of stats"""
+    scale = (1 + maxroll_curve(sdb, 3000)) * (1 + skill_heal)
+    min_heal = ((base_min_damage * SKILL_COEFFICIENT) + SKILL_FLAT_DAMAGE) * scale
+    max_heal = ((base_max_damage * SKILL_COEFFICIENT) + SKILL_FLAT_DAMAGE) * scale
+    crit_prob = maxroll_curve(crit, 6000)
+    hac_prob = maxroll_curve(hac, 1000)
+    return analytic_avg_heal(min_heal, max_heal, crit_prob, hac_prob), analytic_heal_std(min_heal, max_heal, crit_prob, hac_prob)
+
+def interaction_range(stat, value, points=200):
+    """Grid of a stat for the two-stat heatmap: from 0 to its hard cap, or further to take in 1.5x value"""
+    hard_cap = {"sdb": 3000, "hac": 1000, "crit": 6000}[stat]
+    return np.linspace(0, max(hard_cap, 1.5 * value), points)
+
+def analyze_stat_pair(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, x_stat, y_stat, x_values, y_values):
+    """Exact average heal over a grid of two stats, the third held at its given value
+
+    The two stats are broadcast against each other, so the whole grid is one
+    vectorized pass. Returns avg_heal with shape (len(y_values), len(x_values)).
+    """
+    if x_stat == y_stat:
+        raise ValueError("the heatmap needs two different stats")
+    stats = {"sdb": sdb, "hac": hac, "crit": crit}
+    stats[x_stat] = np.asarray(x_values, dtype=float)[np.newaxis, :]
+    stats[y_stat] = np.asarray(y_values, dtype=float)[:, np.newaxis]
+    avg_heal, _ = heal_moments(base_min_damage, base_max_damage, skill_heal, stats["sdb"], stats["hac"], stats["crit"])
+    return avg_heal
+
+def optimize_stats(base_min_damage, base_max_damage, skill_heal, budget, bounds, step=None):
+    """Best SDB/HAC/crit split of budget and its Pareto frontier, see optimize_stat_budget"""
+    def evaluate(sdb, hac, crit):
+        return heal_moments(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit)
+
+    return optimize_stat_budget(evaluate, budget, bounds, step)
+
+def store_stat_allocations(store, base_min_damage, base_max_damage, skill_heal, budget, bounds, step=None, chunk_rows=1 << 20, timings=None):
+    """optimize_stats with every scored split written to a ResultStore chunk by chunk
+
+    A rerun of the same optimization resumes after the store's last completed
+    chunk, and the result reads its columns from the store rather than memory.
+    """
+    if step is None:
+        step = budget / 250
+    sdb, hac, crit, step = stat_allocations(budget, bounds, step)
+    if len(sdb) == 0:
+        raise ValueError("No allocation of the budget fits within the stat bounds")
+    job = {
+        "job": "optimize", "build": [base_min_damage, base_max_damage, skill_heal], "budget": budget,
+        "bounds": [list(bound) for bound in bounds], "step": step, "chunk_rows": chunk_rows
+    }
+    for start in range(store.start(job), len(sdb), chunk_rows):
+        chunk = slice(start, start + chunk_rows)
+        with timed(timings, "optimize: score chunk"):
+            avg_heal, std_heal = heal_moments(base_min_damage, base_max_damage, skill_heal, sdb[chunk], hac[chunk], crit[chunk])
+        with timed(timings, "optimize: store chunk"):
+            store.append({"sdb": sdb[chunk], "hac": hac[chunk], "crit": crit[chunk], "avg_heal": avg_heal, "std_heal": std_heal})
+        count_event(timings, "splits scored", len(avg_heal))
+    return budget_optimization(budget, step, store)
+
+def iter_comparison(base_min_damage, base_max_damage, builds, trials=10000, mode="monte_carlo", paired=True, target_ci=None, base_name="Base", seed=None, workers=1, cache=None, timings=None):
+    """Evaluate (skill_heal, sdb, hac, crit) builds one at a time, yielding (name, result) as each finishes
+
+    workers > 1 needs a main-guarded caller, see run_trial_chunks.
+    """
+    seed_sequence = as_seed_sequence(seed)
+    if seed is None and mode == "monte_carlo":
+        cache = None  # Fresh random draws are never repeated, so there is nothing to reuse
+
+    # Shared draws let rune gains be measured without independent noise per build.
+    # With a target precision they grow until each gain over the base is that precise.
+    # Across processes, reusing one seed gives every build the same draws instead.
+    rolls = None
+    parallel_paired = mode == "monte_carlo" and paired and workers > 1 and target_ci is None
+    if mode == "monte_carlo" and paired and not parallel_paired:
+        exact = {
+            name: calculate_heal(base_min_damage, base_max_damage, *stats, mode="analytic")
+            for name, stats in builds.items()
+        }
+        exact_builds = [(name, heal_build(result)) for name, result in exact.items()]
+        with timed(timings, "comparison: paired rolls"):
+            rolls, build_trials = cached_call(
+                cache, cache_key("paired_rolls", exact_builds, base_name, trials, target_ci, seed_sequence),
+                paired_comparison_rolls, exact, base_name, trials, target_ci, 5000000, seed_sequence
+            )
+
+    # Unpaired builds each get their own child stream
+    build_seeds = seed_sequence.spawn(len(builds))
+
+    results = {}
+    for (name, stats), build_seed in zip(builds.items(), build_seeds):
+        if parallel_paired:
+            with timed(timings, "comparison: simulate build"):
+                results[name] = calculate_heal(
+                    base_min_damage, base_max_damage, *stats, trials, mode, seed=seed_sequence, workers=workers,
+                    cache=cache, timings=timings
+                )
+            if name == base_name:
+                results[name]["gain"], results[name]["gain_se"] = 0.0, 0.0
+            else:
+                build, base_build = heal_build(results[name]), heal_build(results[base_name])
+                with timed(timings, "comparison: paired gains"):
+                    results[name]["gain"], results[name]["gain_se"] = cached_call(
+                        cache, cache_key("gain", build, base_build, trials, seed_sequence, workers),
+                        parallel_paired_difference, build, base_build, trials, seed_sequence, workers
+                    )
+        else:
+            build_rolls = leading_rolls(rolls, build_trials[name]) if rolls is not None else None
+            with timed(timings, "comparison: simulate build"):
+                results[name] = calculate_heal(
+                    base_min_damage, base_max_damage, *stats, trials, mode, build_rolls, target_ci,
+                    seed=build_seed, workers=workers, cache=cache, timings=timings
+                )
+
+            # The base build comes first, so each gain is known as soon as its build finishes
+            if rolls is not None:
+                with timed(timings, "comparison: paired gains"):
+                    add_paired_gains({base_name: results[base_name], name: results[name]}, base_name, rolls, cache)
+
+        yield name, results[name]
+
+def compare_builds(base_min_damage, base_max_damage, builds, base_name="Base", mode="monte_carlo", paired=True, trials=10000, target_ci=None, seed=None, workers=1, cache=None, timings=None):
+    """iter_comparison's results for every build at once, as {name: result}
+
+    workers > 1 needs a main-guarded caller, see run_trial_chunks.
+    """
+    return dict(iter_comparison(
+        base_min_damage, base_max_damage, builds, trials, mode, paired, target_ci, base_name, seed, workers, cache, timings
+    ))
+
+def evaluate_heal_ranges(min_heal, max_heal, crit_prob, hac_prob, mode="analytic", rolls=None):
+    """calculate_heal's statistics for arrays of heal ranges and proc chances, as {field: column}, see evaluate_builds"""
+    results = {"min_heal": min_heal, "max_heal": max_heal}
+    if mode == "analytic":
+        percentiles = heal_quantiles([5, 50, 95], min_heal, max_heal, crit_prob, hac_prob)
+        results["avg_heal"] = analytic_avg_heal(min_heal, max_heal, crit_prob, hac_prob)
+        results["std_heal"] = analytic_heal_std(min_heal, max_heal, crit_prob, hac_prob)
+        results["p5_heal"], results["p50_heal"], results["p95_heal"] = percentiles.T
+        results["crit_percentage"] = crit_prob * 100
+        results["hac_percentage"] = hac_prob * 100
+        results["crit_hac_percentage"] = crit_prob * hac_prob * 100
+    else:
+        summary = summarize_builds(min_heal, max_heal, crit_prob, hac_prob, rolls)
+        trials, avg_heal, _ = summary["moments"]
+        results["avg_heal"] = avg_heal
+        results["avg_heal_ci"] = ci_half_width(summary["moments"])
+        results["trials"] = np.full(len(avg_heal), trials)
+        results["crit_percentage"] = summary["crit_count"] / trials * 100
+        results["hac_percentage"] = summary["hac_count"] / trials * 100
+        results["crit_hac_percentage"] = summary["crit_hac_count"] / trials * 100
+    return results
+
+def evaluate_builds(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, mode="analytic", rolls=None):
+    """calculate_heal's statistics for arrays of builds in one vectorized pass
+
+    Returns a record array, one record per build. Analytic mode adds the exact
+    heal spread and percentiles; Monte Carlo mode evaluates every build on the
+    same roll stream and adds the trials and 95% CI of the average heal.
+    """
+    effective_sdb = maxroll_curve(sdb, 3000)
+    effective_crit = maxroll_curve(crit, 6000)
+    effective_hac = maxroll_curve(hac, 1000)
+
+    scale = (1 + effective_sdb) * (1 + skill_heal)
+    min_heal = ((base_min_damage * SKILL_COEFFICIENT) + SKILL_FLAT_DAMAGE) * scale
+    max_heal = ((base_max_damage * SKILL_COEFFICIENT) + SKILL_FLAT_DAMAGE) * scale
+
+    results = evaluate_heal_ranges(min_heal, max_heal, effective_crit, effective_hac, mode, rolls)
+    results["sdb_maxroll"] = effective_sdb
+    results["crit_maxroll"] = effective_crit
+    results["hac_maxroll"] = effective_hac
+    return result_records(results)
+
+def read_skill(skill):
+    """A skill table entry with its defaults filled in
+
+    Skills are dicts with a name and optionally a damage coefficient, a flat
+    damage bonus, and the proc rules can_crit and can_heavy_attack (both true
+    unless the skill never crits or never triggers Heavy Attack).
+    """
+    if "name" not in skill:
+        raise ValueError(f"skill without a name: {skill!r}")
+    skill = {"coefficient": SKILL_COEFFICIENT, "flat": SKILL_FLAT_DAMAGE, "can_crit": True, "can_heavy_attack": True, **skill}
+    for field in ["coefficient", "flat"]:
+        skill[field] = float(skill[field])
+    for field in ["can_crit", "can_heavy_attack"]:
+        skill[field] = bool(skill[field])
+    return skill
+
+def load_skills(path=SKILLS_PATH):
+    """The skills of a JSON skill table, a list of read_skill entries"""
+    with open(path) as file:
+        table = json.load(file)
+    skills = [read_skill(skill) for skill in table["skills"]]
+    names = [skill["name"] for skill in skills]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path}: skill names must be unique")
+    return skills
+
+def evaluate_skills(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, skills, mode="analytic", rolls=None):
+    """evaluate_builds' statistics for every skill of one build in one vectorized pass
+
+    The build's multipliers (the maxroll curves and the skill heal factor) are
+    worked out once; each skill only brings its coefficient, flat bonus and
+    which procs it can trigger. Returns a record array in skill order, with
+    the skill names in its name field.
+    """
+    effective_sdb = maxroll_curve(sdb, 3000)
+    effective_crit = maxroll_curve(crit, 6000)
+    effective_hac = maxroll_curve(hac, 1000)
+    scale = (1 + effective_sdb) * (1 + skill_heal)
+
+    coefficients = np.array([skill["coefficient"] for skill in skills])
+    flats = np.array([skill["flat"] for skill in skills])
+    min_heal = (base_min_damage * coefficients + flats) * scale
+    max_heal = (base_max_damage * coefficients + flats) * scale
+    crit_prob = np.where([skill["can_crit"] for skill in skills], effective_crit, 0.0)
+    hac_prob = np.where([skill["can_heavy_attack"] for skill in skills], effective_hac, 0.0)
+
+    results = evaluate_heal_ranges(min_heal, max_heal, crit_prob, hac_prob, mode, rolls)
+    results["name"] = [skill["name"] for skill in skills]
+    return result_records(results)
+
+def read_cast(cast):
+    """A rotation cast with its defaults filled in and its timings checked
+
+    Casts are dicts with a name, a cast_time and optionally a cooldown (both in
+    seconds), a damage coefficient and a flat damage bonus.
+    """
+    cast = {"cooldown": 0.0, "coefficient": SKILL_COEFFICIENT, "flat": SKILL_FLAT_DAMAGE, **cast}
+    for field in ["cast_time", "cooldown", "coefficient", "flat"]:
+        cast[field] = float(cast[field])
+        if cast[field] < 0:
+            raise ValueError(f"{cast['name']}: {field} must not be negative")
+    if cast["cast_time"] == 0 and cast["cooldown"] == 0:
+        raise ValueError(f"{cast['name']}: an instant cast needs a cooldown")
+    return cast
+
+def rotation_schedule(casts, duration):
+    """Which cast lands when over an encounter of duration seconds, as (cast indices, landing times)
+
+    The rotation is a priority list: whenever a cast finishes, the first cast
+    off cooldown is started next, and if none is ready the caster waits for the
+    earliest one. Cooldowns run from the start of a cast and heals land as it
+    finishes; a cast that would finish after the encounter ends is not counted.
+    """
+    ready = [0.0] * len(casts)
+    order, land_times = [], []
+    now = 0.0
+    while True:
+        # A small tolerance keeps cooldowns that end exactly now from slipping past float noise
+        index = next((i for i, ready_at in enumerate(ready) if ready_at <= now + 1e-9), None)
+        if index is None:
+            now = min(ready)
+            continue
+        lands = now + casts[index]["cast_time"]
+        if lands > duration:
+            break
+        if len(order) == MAX_ROTATION_CASTS:
+            raise ValueError(f"the rotation casts more than {MAX_ROTATION_CASTS:,} times per encounter")
+        order.append(index)
+        land_times.append(lands)
+        ready[index] = now + casts[index]["cooldown"]
+        now = lands
+    return np.array(order, dtype=int), np.array(land_times)
+
+def simulate_rotation(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, casts, duration, trials=10000, heal_targets=(), seed=None, timings=None):
+    """Simulate trials encounters of a rotation, for the spread of HPS and how fast healing adds up
+
+    The schedule is the same in every encounter, so only the heal rolls are
+    random: each chunk of the roll stream holds whole encounters as an
+    (encounters x casts) array, cumulated along the casts. Returns the HPS
+    distribution next to its exact mean and spread, the average cumulative heal
+    at each landing time, and for each of heal_targets how often and how soon
+    an encounter's healing reached it.
+    """
+    if trials < 1:
+        raise ValueError("trials must be at least 1")
+    casts = [read_cast(cast) for cast in casts]
+    with timed(timings, "rotation: schedule"):
+        order, land_times = rotation_schedule(casts, duration)
+    cast_count = len(order)
+    if cast_count == 0:
+        raise ValueError("no cast of the rotation finishes within the encounter")
+
+    # Heal range of every cast in landing order
+    scale = (1 + maxroll_curve(sdb, 3000)) * (1 + skill_heal)
+    coefficients = np.array([cast["coefficient"] for cast in casts])[order]
+    flats = np.array([cast["flat"] for cast in casts])[order]
+    min_heal = (base_min_damage * coefficients + flats) * scale
+    max_heal = (base_max_damage * coefficients + flats) * scale
+    crit_prob = maxroll_curve(crit, 6000)
+    hac_prob = maxroll_curve(hac, 1000)
+
+    encounters_per_chunk = max(1, BATCH_ELEMENTS // cast_count)
+    rolls = roll_stream(trials * cast_count, seed, encounters_per_chunk * cast_count)
+    totals = np.empty(trials)
+    cumulative_moments = EMPTY_MOMENTS
+    reach_times = {target: np.empty(trials) for target in heal_targets}
+    start = 0
+    with timed(timings, "rotation: simulate"):
+        for roll_u, crit_u, hac_u in iter_rolls(rolls):
+            shape = (-1, cast_count)
+            heals = min_heal + (max_heal - min_heal) * roll_u.reshape(shape)
+            heals = np.where(crit_u.reshape(shape) < crit_prob, max_heal, heals)  # Crit ensures max heal
+            heals[hac_u.reshape(shape) < hac_prob] *= 2  # Heavy Attack doubles heal
+            cumulative = np.cumsum(heals, axis=1)
+
+            stop = start + len(cumulative)
+            totals[start:stop] = cumulative[:, -1]
+            # combine_moments works element-wise, so one call pools every landing time
+            chunk_mean = cumulative.mean(axis=0)
+            cumulative_moments = combine_moments(
+                cumulative_moments, (len(cumulative), chunk_mean, ((cumulative - chunk_mean) ** 2).sum(axis=0))
+            )
+            for target, times in reach_times.items():
+                reached = cumulative >= target
+                # The first cast at or past the target, or inf if the encounter never got there
+                times[start:stop] = np.where(reached[:, -1], land_times[reached.argmax(axis=1)], np.inf)
+            start = stop
+    count_event(timings, "encounters simulated", trials)
+
+    hps = totals / duration
+    hps_moments = merge_moments(EMPTY_MOMENTS, hps)
+    # Casts are independent, so their exact variances add up
+    exact_std = np.sqrt((analytic_heal_std(min_heal, max_heal, crit_prob, hac_prob) ** 2).sum()) / duration
+    count, _, m2 = cumulative_moments
+
+    time_to_heal = {}
+    for target, times in reach_times.items():
+        reached = np.isfinite(times)
+        time_to_heal[target] = {
+            "reached": reached.mean(),
+            "mean_seconds": times[reached].mean() if reached.any() else np.inf,
+            # Unreached encounters count as inf; picking order statistics keeps them from turning into nan
+            "percentiles": np.percentile(times, [5, 50, 95], method="inverted_cdf")
+        }
+
+    return {
+        "duration": duration,
+        "trials": trials,
+        "casts": cast_count,
+        "cast_counts": {cast["name"]: int((order == i).sum()) for i, cast in enumerate(casts)},
+        "hps": hps_moments[1],
+        "hps_ci": ci_half_width(hps_moments),
+        "hps_std": np.sqrt(hps_moments[2] / max(trials - 1, 1)),
+        "hps_percentiles": np.percentile(hps, [5, 50, 95]),
+        "exact_hps": analytic_avg_heal(min_heal, max_heal, crit_prob, hac_prob).sum() / duration,
+        "exact_hps_std": exact_std,
+        "land_times": land_times,
+        "cumulative_heal": cumulative_moments[1],
+        "cumulative_heal_std": np.sqrt(m2 / max(count - 1, 1)),
+        "time_to_heal": time_to_heal
+    }
+
+# Rune types a catalog may use, as the calculator names them, with the stat each adds to
+RUNE_STATS = {
+    "Skill Heal": "skill_heal",
+    "Skill Damage Boost": "sdb",
+    "Heavy Attack Chance": "hac",
+    "Crit Chance": "crit"
+}
+
+# Catalog units of each stat as a build value: Skill Heal is given in percent
+RUNE_UNITS = np.array([0.01, 1, 1, 1])
+
+# Partial combinations carried into the first, approximate pass of explore_runes
+RUNE_BEAM = 256
+
+def read_rune_catalog(path=RUNES_PATH):
+    """(slots, runes) of a JSON rune catalog
+
+    slots maps each slot name to how many runes it holds; every rune has a
+    name, a slot, a type from RUNE_STATS and a value (Skill Heal in percent, as
+    in the calculator). Each rune in the catalog can be used once.
+    """
+    with open(path) as file:
+        catalog = json.load(file)
+    slots = {name: int(capacity) for name, capacity in catalog["slots"].items()}
+    runes = []
+    for rune in catalog["runes"]:
+        if rune["slot"] not in slots:
+            raise ValueError(f"{rune['name']}: unknown slot {rune['slot']!r}")
+        if rune["type"] not in RUNE_STATS:
+            raise ValueError(f"{rune['name']}: type must be one of {list(RUNE_STATS)}")
+        value = float(rune["value"])
+        if value < 0:
+            raise ValueError(f"{rune['name']}: value must not be negative")
+        runes.append({"name": rune["name"], "slot": rune["slot"], "type": rune["type"], "value": value})
+    return slots, runes
+
+def rune_totals(rune):
+    """What a rune adds to each stat, in RUNE_STATS order and catalog units"""
+    totals = np.zeros(len(RUNE_STATS))
+    totals[list(RUNE_STATS).index(rune["type"])] = rune["value"]
+    return totals
+
+def count_rune_combinations(slots, runes, rune_count):
+    """How many legal combinations of rune_count runes the catalog has, without listing them"""
+    ways = {0: 1}
+    for slot, capacity in slots.items():
+        available = sum(rune["slot"] == slot for rune in runes)
+        slot_ways = {}
+        for count, total in ways.items():
+            for taken in range(min(capacity, available, rune_count - count) + 1):
+                slot_ways[count + taken] = slot_ways.get(count + taken, 0) + total * math.comb(available, taken)
+        ways = slot_ways
+    return ways.get(rune_count, 0)
+
+def useful_runes(slots, runes, keep):
+    """Catalog indices of the runes that can appear in a top-keep combination, grouped by slot
+
+    A combination using a rune that capacity + keep - 1 better (or equal, earlier)
+    runes of the same slot and type outrank leaves at least keep of them unused,
+    and swapping any one in gives keep distinct combinations at least as good.
+    """
+    grouped = {slot: [] for slot in slots}
+    for slot, capacity in slots.items():
+        for rune_type in RUNE_STATS:
+            indices = [index for index, rune in enumerate(runes) if rune["slot"] == slot and rune["type"] == rune_type]
+            indices.sort(key=lambda index: -runes[index]["value"])
+            grouped[slot].extend(indices[:capacity + keep - 1])
+    return grouped
+
+def rune_completions(slot_totals, capacities, rune_count):
+    """For each slot position i, the most each stat can gain from m more runes in slots i onwards
+
+    Returns an array of shape (slots + 1, rune_count + 1, stats), -inf where m runes
+    do not fit. Every stat is maximized on its own, so the bound is optimistic.
+    """
+    completions = np.full((len(slot_totals) + 1, rune_count + 1, len(RUNE_STATS)), -np.inf)
+    completions[-1, 0] = 0
+    for i in range(len(slot_totals) - 1, -1, -1):
+        # best[j]: the most each stat gains from j runes of this slot
+        taken = min(capacities[i], len(slot_totals[i]), rune_count)
+        best = np.vstack([np.zeros(len(RUNE_STATS)), np.cumsum(-np.sort(-slot_totals[i], axis=0), axis=0)])[:taken + 1]
+        for j in range(taken + 1):
+            completions[i, j:] = np.maximum(completions[i, j:], best[j] + completions[i + 1, :rune_count + 1 - j])
+    return completions
+
+def undominated(totals, keep):
+    """Indices of the rows of totals that fewer than keep other rows dominate
+
+    Average heal rises with every stat, so a combination that some other one
+    matches or beats in every total heals no more. One dominated by keep others
+    can never make a top-keep list, and neither can anything built on it.
+    Identical rows dominate the later copies, so ties are kept in order.
+    """
+    if not len(totals):
+        return np.empty(0, dtype=int)
+    # Dominating rows score at least as high on any positive weighting of the totals, so after
+    # sorting they all come first. Weighting by the column ranges puts good all-rounders first,
+    # and those dominate the most.
+    scale = np.ptp(totals, axis=0)
+    order = np.argsort(-(totals / np.where(scale > 0, scale, 1)).sum(axis=1), kind="stable")
+    totals = totals[order]
+
+    # Among the rows dominating a row, the first keep have fewer than keep dominators
+    # themselves, so it is enough to count the ones kept so far (and earlier rows of its block)
+    kept = np.empty((0, totals.shape[1]))
+    kept_rows = []
+    block_rows = 1024
+    for start in range(0, len(totals), block_rows):
+        block = totals[start:start + block_rows]
+        by_kept = (kept[np.newaxis, :, :] >= block[:, np.newaxis, :]).all(axis=2).sum(axis=1)
+        by_block = np.tril((block[np.newaxis, :, :] >= block[:, np.newaxis, :]).all(axis=2), -1).sum(axis=1)
+        survivors = np.flatnonzero(by_kept + by_block < keep)
+        kept = np.vstack([kept, block[survivors]])
+        kept_rows.append(order[start + survivors])
+    return np.sort(np.concatenate(kept_rows))
+
+def merge_rune_options(options, other, max_count):
+    """Every pairing of two {count: (totals, picks)} option sets within max_count runes
+
+    picks are bitmasks of catalog indices, so a pairing's runes are the union of its parts'.
+    """
+    merged = {}
+    for count, (totals, picks) in options.items():
+        for other_count, (other_totals, other_picks) in other.items():
+            if count + other_count > max_count:
+                continue
+            # Rounded so the same runes summed in another order still compare equal
+            pair_totals = np.round(totals[:, np.newaxis, :] + other_totals[np.newaxis, :, :], 9).reshape(-1, len(RUNE_STATS))
+            pair_picks = np.bitwise_or.outer(picks, other_picks).ravel()
+            merged.setdefault(count + other_count, []).append((pair_totals, pair_picks))
+    return {
+        count: (np.concatenate([part[0] for part in parts]), np.concatenate([part[1] for part in parts]))
+        for count, parts in merged.items()
+    }
+
+def rune_heals(base_min_damage, base_max_damage, build, totals):
+    """Exact average heal of build with each row of rune totals added"""
+    builds = totals * RUNE_UNITS + build
+    return heal_moments(base_min_damage, base_max_damage, *builds.T)[0]
+
+def grow_rune_options(base_min_damage, base_max_damage, build, slot_totals, slot_picks, capacities, rune_count, keep, threshold=None):
+    """Combinations of rune_count runes, slot by slot, as (totals, picks, avg_heal)
+
+    After each slot, partial combinations are ranked by the heal of their
+    optimistic completion (rune_completions). Without a threshold only the best
+    RUNE_BEAM of each size are carried on, which quickly finds good combinations;
+    with one, those whose bound falls below it are dropped, then the dominated.
+    """
+    completions = rune_completions(slot_totals, capacities, rune_count)
+    empty = {0: (np.zeros((1, len(RUNE_STATS))), np.array([0], dtype=object))}
+    options = empty
+    for i, capacity in enumerate(capacities):
+        slot_options = empty
+        for totals, pick in zip(slot_totals[i], slot_picks[i]):
+            choice = {**empty, 1: (totals[np.newaxis, :], np.array([pick], dtype=object))}
+            slot_options = merge_rune_options(slot_options, choice, min(capacity, rune_count))
+            for count, (totals, picks) in slot_options.items():
+                kept = undominated(totals, keep)
+                slot_options[count] = (totals[kept], picks[kept])
+
+        pruned = {}
+        for count, (totals, picks) in merge_rune_options(options, slot_options, rune_count).items():
+            completion = completions[i + 1, rune_count - count]
+            if np.isinf(completion).any():
+                continue
+            bounds = rune_heals(base_min_damage, base_max_damage, build, totals + completion)
+            if threshold is None:
+                kept = np.argsort(-bounds, kind="stable")[:RUNE_BEAM]
+            else:
+                # A little slack, so rounding never drops a combination that ties the threshold
+                kept = np.flatnonzero(bounds >= threshold - 1e-9 * abs(threshold))
+                kept = kept[undominated(totals[kept], keep)]
+            pruned[count] = (totals[kept], picks[kept], bounds[kept])
+        options = {count: option[:2] for count, option in pruned.items()}
+    return pruned.get(rune_count, (np.empty((0, len(RUNE_STATS))), np.empty(0, dtype=object), np.empty(0)))
+
+def explore_runes(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, slots, runes, rune_count, top=10, mode="analytic", rolls=None, timings=None):
+    """The top builds among every legal combination of rune_count catalog runes, with their gain over the base
+
+    Branch and bound over the slots: a first pass keeping only promising partial
+    combinations finds top good ones, whose worst heal is a bar every partial
+    combination's optimistic completion must reach in the exact second pass.
+    Those that do are also dropped once top others dominate them (undominated).
+    Average heal rises with every stat, so no combination that belongs in the
+    top is ever dropped. The search ranks on the exact average heal; Monte
+    Carlo mode then simulates the top builds and the base on the same rolls,
+    so each gain comes with the standard error of its paired difference.
+    """
+    if top < 1:
+        raise ValueError("top must be at least 1")
+    build = np.array([skill_heal, sdb, hac, crit])
+    grouped = useful_runes(slots, runes, top)
+    capacities = list(slots.values())
+    slot_totals = [np.array([rune_totals(runes[index]) for index in grouped[slot]]).reshape(-1, len(RUNE_STATS)) for slot in slots]
+    slot_picks = [[1 << index for index in grouped[slot]] for slot in slots]
+    if sum(min(capacity, len(grouped[slot])) for slot, capacity in slots.items()) < rune_count:
+        raise ValueError(f"the catalog's slots cannot hold {rune_count} runes")
+
+    args = (base_min_damage, base_max_damage, build, slot_totals, slot_picks, capacities, rune_count, top)
+    with timed(timings, "explore: first pass"):
+        heals = grow_rune_options(*args)[2]
+    threshold = np.sort(heals)[-top] if len(heals) >= top else -np.inf
+    with timed(timings, "explore: exact pass"):
+        totals, picks, heals = grow_rune_options(*args, threshold)
+    count_event(timings, "rune combinations evaluated", len(totals))
+
+    # The base build first, then the top combinations, through the engine in one batch
+    ranked = np.argsort(-heals, kind="stable")[:top]
+    builds = np.vstack([np.zeros(len(RUNE_STATS)), totals[ranked]]) * RUNE_UNITS + build
+    with timed(timings, "explore: evaluate top"):
+        evaluation = evaluate_builds(base_min_damage, base_max_damage, *builds.T, mode=mode, rolls=rolls)
+    base_avg_heal = evaluation["avg_heal"][0]
+
+    results = []
+    for row, i in enumerate(ranked, 1):
+        skill_heal_total, sdb_total, hac_total, crit_total = builds[row]
+        result = {
+            "runes": [rune["name"] for index, rune in enumerate(runes) if picks[i] >> index & 1],
+            "skill_heal": skill_heal_total,
+            "sdb": sdb_total,
+            "hac": hac_total,
+            "crit": crit_total,
+            "avg_heal": evaluation["avg_heal"][row],
+            "gain": evaluation["avg_heal"][row] - base_avg_heal
+        }
+        if mode != "analytic":
+            result["gain"], result["gain_se"] = paired_heal_difference(heal_build(evaluation[row]), heal_build(evaluation[0]), rolls)
+        results.append(result)
+    return {
+        "combinations": count_rune_combinations(slots, runes, rune_count),
+        "evaluated": len(totals),
+        "base_avg_heal": base_avg_heal,
+        "top": results
+    }
@@ -1,109 +1,44 @@
+import os
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from healCalc_engine import (
+    iter_comparison, compare_builds, iter_stat_sweeps, heal_moments, optimize_stats, evaluate_skills,
+    load_skills, interaction_range, analyze_stat_pair, roll_stream, read_rune_catalog, explore_runes, cache_key, SKILLS_PATH,
+    RUNES_PATH, ResultCache, StageTimings, timed, count_event, format_timings
+)
 
-def maxroll_curve(value, factor):
-    return value / (value + factor)
+# Where remembered results are kept between sessions
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".healcalc_cache.pkl")
 
-def calculate_heal(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, trials=10000):
-    # Compute effective multipliers using maxroll returns
-    effective_sdb = maxroll_curve(sdb, 3000)
-    effective_crit = maxroll_curve(crit, 6000)
-    effective_hac = maxroll_curve(hac, 1000)
-    
-    # Compute skill damage range
-    min_skill_damage = (base_min_damage * 6.1) + 232
-    max_skill_damage = (base_max_damage * 6.1) + 232
-    
-    # Compute healing range
-    min_heal = min_skill_damage * (1 + effective_sdb) * (1 + skill_heal)
-    max_heal = max_skill_damage * (1 + effective_sdb) * (1 + skill_heal)
-    
-    # Compute probabilities
-    crit_prob = effective_crit
-    hac_prob = effective_hac
-    
-    # Monte Carlo Simulation
-    heal_values = []
-    crit_count = 0
-    hac_count = 0
-    crit_hac_count = 0
-    
-    for _ in range(trials):
-        heal = np.random.uniform(min_heal, max_heal)
-        is_crit = np.random.rand() < crit_prob
-        is_hac = np.random.rand() < hac_prob
-        
-        if is_crit:
-            heal = max_heal  # Crit ensures max heal
-            crit_count += 1
-        if is_hac:
-            heal *= 2  # Heavy Attack doubles heal
-            hac_count += 1
-        if is_crit and is_hac:
-            crit_hac_count += 1
-        
-        heal_values.append(heal)
-    
-    return {
-        "avg_heal": np.mean(heal_values),
-        "min_heal": min_heal,
-        "max_heal": max_heal,
-        "percentiles": np.percentile(heal_values, [5, 50, 95]),
-        "sdb_maxroll": effective_sdb,
-        "crit_maxroll": effective_crit,
-        "hac_maxroll": effective_hac,
-        "crit_percentage": (crit_count / trials) * 100,
-        "hac_percentage": (hac_count / trials) * 100,
-        "crit_hac_percentage": (crit_hac_count / trials) * 100,
-        "distribution": heal_values,
-        "sdb": sdb,
-        "hac": hac,
-        "crit": crit,
-        "trials": trials
-    }
+# Title and soft cap value of each stat-curve tab, in tab order
+CURVE_TABS = {
+    "sdb": ("Skill Damage Boost", 3000),
+    "hac": ("Heavy Attack Chance", 1000),
+    "crit": ("Critical Hit Chance", 6000)
+}
 
-def analyze_stat_effectiveness(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, stat_to_analyze, range_points=20, trials=10000):
-    """Analyze how effective adding more of a stat would be from current value"""
-    results = []
-    current_stats = {"sdb": sdb, "hac": hac, "crit": crit}
-    
-    # Define ranges based on which stat we're analyzing
-    if stat_to_analyze == "sdb":
-        # Analyze -300 to +300 from current SDB
-        stat_range = np.linspace(max(0, sdb - 300), sdb + 300, range_points)
-    elif stat_to_analyze == "hac":
-        # Analyze -300 to +300 from current HAC
-        stat_range = np.linspace(max(0, hac - 300), hac + 300, range_points)
-    elif stat_to_analyze == "crit":
-        # Analyze -300 to +300 from current crit
-        stat_range = np.linspace(max(0, crit - 300), crit + 300, range_points)
-    
-    # Calculate healing for each value in the range
-    for value in stat_range:
-        temp_stats = current_stats.copy()
-        temp_stats[stat_to_analyze] = value
-        
-        result = calculate_heal(
-            base_min_damage, 
-            base_max_damage, 
-            skill_heal, 
-            temp_stats["sdb"], 
-            temp_stats["hac"], 
-            temp_stats["crit"],
-            trials
-        )
-        
-        results.append({
-            "value": value,
-            "avg_heal": result["avg_heal"],
-            f"{stat_to_analyze}_maxroll": result[f"{stat_to_analyze}_maxroll"]
-        })
-    
-    return results
+# Heatmap axis labels and the stat each stands for
+STAT_LABELS = {"SDB": "sdb", "HAC": "hac", "Crit": "crit"}
+
+# Pause after the last keystroke before a live update recalculates
+LIVE_UPDATE_DELAY_MS = 300
+
+def sticky_limits(limits, low, high, margin=0.05):
+    """Limits for data spanning [low, high]: the current ones while the data still fills half of them, else freshly padded"""
+    if limits is not None and limits[0] <= low and high <= limits[1] and high - low >= 0.5 * (limits[1] - limits[0]):
+        return limits
+    pad = margin * (high - low) or margin * abs(high) or 1.0
+    return (low - pad, high + pad)
+
+def load_matplotlib():
+    """Figure and FigureCanvasTkAgg, imported on first use so the window opens without loading matplotlib"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    return Figure, FigureCanvasTkAgg
 
 class HealCalcApp:
     def __init__(self, root):
@@ -121,6 +56,30 @@ class HealCalcApp:
         self.style.configure("Result.TLabel", font=("Arial", 10, "bold"))
         self.style.configure("Documentation.TLabel", font=("Arial", 9))
         
+        # Background calculation state; results come back through job_queue
+        self.job_queue = queue.Queue()
+        self.job_id = 0
+        self.cancel_event = None
+        self.job_results = {}
+        self.job_estimates = {}
+        self.job_curves = 0
+        self.polling_jobs = False
+        
+        # Pending debounced live update, as a Tk after() id
+        self.live_update_after = None
+        
+        # Latest sweep of each stat tab as (inputs key, analysis, current value); tabs in
+        # curves_to_draw have a sweep they are not showing yet and draw it when opened
+        self.curve_data = {}
+        self.curves_to_draw = set()
+        
+        # Seeded and analytic results are remembered, so repeat what-ifs come back instantly
+        self.result_cache = ResultCache(maxsize=256)
+        
+        # Stage timings, recorded only while the Diagnostics tab has them switched on
+        self.timings = None
+        self.job_started = None
+        
         # Main notebook for tabs
         self.main_notebook = ttk.Notebook(self.root)
         self.main_notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -129,6 +88,22 @@ class HealCalcApp:
         self.calculator_frame = ttk.Frame(self.main_notebook, padding="10")
         self.main_notebook.add(self.calculator_frame, text="Calculator")
         
+        # Optimizer tab
+        self.optimizer_frame = ttk.Frame(self.main_notebook, padding="10")
+        self.main_notebook.add(self.optimizer_frame, text="Optimizer")
+        
+        # Skills tab
+        self.skills_frame = ttk.Frame(self.main_notebook, padding="10")
+        self.main_notebook.add(self.skills_frame, text="Skills")
+        
+        # Rune explorer tab
+        self.explorer_frame = ttk.Frame(self.main_notebook, padding="10")
+        self.main_notebook.add(self.explorer_frame, text="Rune Explorer")
+        
+        # Diagnostics tab
+        self.diagnostics_frame = ttk.Frame(self.main_notebook, padding="10")
+        self.main_notebook.add(self.diagnostics_frame, text="Diagnostics")
+        
         # Documentation tab
         self.docs_frame = ttk.Frame(self.main_notebook, padding="10")
         self.main_notebook.add(self.docs_frame, text="Documentation")
@@ -136,6 +111,18 @@ class HealCalcApp:
         # Set up calculator UI
         self.setup_calculator_ui()
         
+        # Set up optimizer UI
+        self.setup_optimizer_ui()
+        
+        # Set up skills UI
+        self.setup_skills_ui()
+        
+        # Set up rune explorer UI
+        self.setup_explorer_ui()
+        
+        # Set up diagnostics UI
+        self.setup_diagnostics_ui()
+        
         # Set up documentation UI
         self.setup_documentation_ui()
     
@@ -156,6 +143,9 @@ class HealCalcApp:
         # Create results frame
         self.create_results_frame()
         
+        # Recalculate as inputs change while Live update is ticked
+        self.setup_live_updates()
+        
         # Create graph frame
         self.create_graph_frame()
     
@@ -201,7 +191,7 @@ class HealCalcApp:
         self.trials_scale = ttk.Scale(
             sim_frame, 
             from_=1000, 
-            to=100000, 
+            to=1000000, 
             orient="horizontal", 
             variable=self.trials_var,
             length=300
@@ -225,17 +215,102 @@ class HealCalcApp:
         apply_button = ttk.Button(sim_frame, text="Apply Custom", command=self.apply_custom_trials)
         apply_button.grid(column=2, row=1, padx=5, pady=2)
         
-        # Warning text
-        warning_text = "Warning: Values above 100,000 may significantly slow down calculations"
-        ttk.Label(sim_frame, text=warning_text, foreground="red").grid(
+        # Performance hint
+        perf_text = "Recommended: 10,000 trials or more (1,000,000 trials still run in well under a second)"
+        ttk.Label(sim_frame, text=perf_text, foreground="blue").grid(
             column=0, row=2, columnspan=3, sticky=tk.W, padx=5, pady=2
         )
         
-        # Performance hint
-        perf_text = "Recommended: 10,000 trials (balance of accuracy and speed)"
-        ttk.Label(sim_frame, text=perf_text, foreground="blue").grid(
-            column=0, row=3, columnspan=3, sticky=tk.W, padx=5, pady=2
+        # Calculation mode selection
+        ttk.Label(sim_frame, text="Calculation Mode:").grid(column=0, row=3, sticky=tk.W, padx=5, pady=2)
+        self.mode_var = tk.StringVar(value="Monte Carlo")
+        ttk.Combobox(
+            sim_frame, 
+            textvariable=self.mode_var, 
+            values=["Monte Carlo", "Analytic (exact)"], 
+            state="readonly", 
+            width=20
+        ).grid(column=1, row=3, sticky=tk.W, padx=5, pady=2)
+        
+        # Paired comparison (common random numbers) toggle
+        self.paired_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            sim_frame, 
+            text="Paired comparison (all builds share the same random draws)", 
+            variable=self.paired_var
+        ).grid(column=0, row=4, columnspan=3, sticky=tk.W, padx=5, pady=2)
+        
+        # Target precision entry (blank runs the fixed trial count)
+        ttk.Label(sim_frame, text="Target Precision (±heal):").grid(column=0, row=5, sticky=tk.W, padx=5, pady=2)
+        self.target_ci_var = tk.StringVar(value="")
+        ttk.Entry(sim_frame, width=10, textvariable=self.target_ci_var).grid(column=1, row=5, sticky=tk.W, padx=5, pady=2)
+        ttk.Label(sim_frame, text="Optional 95% CI target for each gain (paired) or average heal (unpaired); trials then sets the chunk size", foreground="blue").grid(
+            column=2, row=5, sticky=tk.W, padx=5, pady=2
+        )
+        
+        # Seed and worker processes for reproducible, multi-core runs
+        ttk.Label(sim_frame, text="Seed:").grid(column=0, row=6, sticky=tk.W, padx=5, pady=2)
+        self.seed_var = tk.StringVar(value="")
+        ttk.Entry(sim_frame, width=10, textvariable=self.seed_var).grid(column=1, row=6, sticky=tk.W, padx=5, pady=2)
+        ttk.Label(sim_frame, text="Optional; the same seed and worker count give identical results", foreground="blue").grid(
+            column=2, row=6, sticky=tk.W, padx=5, pady=2
+        )
+        
+        ttk.Label(sim_frame, text="Worker Processes:").grid(column=0, row=7, sticky=tk.W, padx=5, pady=2)
+        self.workers_var = tk.StringVar(value="1")
+        ttk.Spinbox(sim_frame, from_=1, to=os.cpu_count() or 1, width=8, textvariable=self.workers_var).grid(
+            column=1, row=7, sticky=tk.W, padx=5, pady=2
         )
+        
+        # Keep the result cache on disk between sessions
+        self.persist_cache_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            sim_frame, text="Remember results between sessions", variable=self.persist_cache_var,
+            command=self.toggle_persistent_cache
+        ).grid(column=0, row=8, columnspan=2, sticky=tk.W, padx=5, pady=2)
+        ttk.Button(sim_frame, text="Clear Cache", command=self.clear_cache).grid(column=2, row=8, sticky=tk.W, padx=5, pady=2)
+    
+    def toggle_persistent_cache(self):
+        """Load saved results when remembering is switched on; stop saving when it is off"""
+        if self.persist_cache_var.get():
+            self.result_cache.path = CACHE_PATH
+            self.result_cache.load()
+        else:
+            self.result_cache.path = None
+    
+    def clear_cache(self):
+        """Forget every cached result, including the saved copy"""
+        self.result_cache.clear()
+        self.curve_data.clear()
+        self.curves_to_draw.clear()
+        if self.result_cache.path is not None and os.path.exists(self.result_cache.path):
+            os.remove(self.result_cache.path)
+        self.status_var.set("Cache cleared")
+    
+    def get_seed(self):
+        """Integer seed, or None for fresh random draws"""
+        seed = self.seed_var.get().strip()
+        return int(seed) if seed else None
+    
+    def get_workers(self):
+        workers = int(self.workers_var.get())
+        if workers < 1:
+            raise ValueError("Worker processes must be at least 1")
+        return workers
+    
+    def get_target_precision(self):
+        """Target 95% CI half-width in heal, or None to run the fixed trial count"""
+        target = self.target_ci_var.get().strip()
+        if not target:
+            return None
+        target_ci = float(target)
+        if target_ci <= 0:
+            raise ValueError("Target precision must be positive")
+        return target_ci
+    
+    def get_calculation_mode(self):
+        """Map the mode selector to the calculate_heal mode name"""
+        return "analytic" if self.mode_var.get() == "Analytic (exact)" else "monte_carlo"
     
     def update_trials_display(self, value):
         """Update the trials display label"""
@@ -250,15 +325,15 @@ class HealCalcApp:
             if trials < 1000:
                 messagebox.showwarning("Warning", "Minimum 1,000 trials recommended for accurate results")
                 trials = 1000
-            elif trials > 500000:
+            elif trials > 5000000:
                 result = messagebox.askyesno(
                     "Performance Warning", 
-                    "Running more than 500,000 trials may cause your computer to freeze or crash. Continue anyway?"
+                    "Running more than 5,000,000 trials takes several seconds per build. Continue anyway?"
                 )
                 if not result:
                     return
             
-            self.trials_var.set(min(trials, 100000) if trials <= 100000 else 100000)
+            self.trials_var.set(min(trials, 1000000))
             self.trials_display.configure(text=f"{trials:,}")
             
         except ValueError:
@@ -304,9 +379,24 @@ class HealCalcApp:
             self.rune_names.append(rune_name_var)
             ttk.Entry(rune_frame, width=20, textvariable=rune_name_var).grid(column=3, row=i+1, padx=5, pady=2)
         
-        # Calculate button
-        self.calculate_button = ttk.Button(rune_frame, text="Calculate", command=self.calculate_comparison)
-        self.calculate_button.grid(column=0, row=5, columnspan=4, pady=10)
+        # Calculate/Cancel buttons with job progress
+        action_frame = ttk.Frame(rune_frame)
+        action_frame.grid(column=0, row=5, columnspan=4, pady=10)
+        
+        self.calculate_button = ttk.Button(action_frame, text="Calculate", command=self.calculate_comparison)
+        self.calculate_button.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_button = ttk.Button(action_frame, text="Cancel", command=self.cancel_calculation, state="disabled")
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        
+        self.live_update_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(action_frame, text="Live update", variable=self.live_update_var).pack(side=tk.LEFT, padx=5)
+        
+        self.progress_bar = ttk.Progressbar(action_frame, orient="horizontal", length=200, mode="determinate")
+        self.progress_bar.pack(side=tk.LEFT, padx=5)
+        
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(action_frame, textvariable=self.status_var).pack(side=tk.LEFT, padx=5)
     
     def create_results_frame(self):
         # Results Frame
@@ -344,18 +434,525 @@ class HealCalcApp:
         self.graph_notebook.add(self.hac_frame, text="HAC Effectiveness")
         self.graph_notebook.add(self.crit_frame, text="Crit Effectiveness")
         
-        # Create figure for each tab
-        self.sdb_figure = Figure(figsize=(5, 4), dpi=100)
-        self.sdb_canvas = FigureCanvasTkAgg(self.sdb_figure, master=self.sdb_frame)
-        self.sdb_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Each tab gets its figure when its curve is first drawn; until then it shows a hint
+        self.stat_frames = {"sdb": self.sdb_frame, "hac": self.hac_frame, "crit": self.crit_frame}
+        self.stat_figures = {}
+        self.stat_curves = {}
+        self.curve_placeholders = {}
+        for stat, frame in self.stat_frames.items():
+            self.curve_placeholders[stat] = ttk.Label(frame, text="Press Calculate to plot this curve")
+            self.curve_placeholders[stat].pack(expand=True)
+        
+        # Two-stat heatmap with the third stat held fixed
+        self.interaction_frame = ttk.Frame(self.graph_notebook)
+        self.graph_notebook.add(self.interaction_frame, text="Stat Interaction")
+        self.create_interaction_controls()
+        
+        # Hidden tabs are only drawn once they are opened
+        self.graph_notebook.bind("<<NotebookTabChanged>>", lambda event: self.show_graph_tab())
+    
+    def create_interaction_controls(self):
+        controls = ttk.Frame(self.interaction_frame)
+        controls.pack(fill=tk.X, padx=5, pady=2)
+        
+        self.interaction_x_var = tk.StringVar(value="Crit")
+        self.interaction_y_var = tk.StringVar(value="HAC")
+        for column, (label, var) in enumerate([("X:", self.interaction_x_var), ("Y:", self.interaction_y_var)]):
+            ttk.Label(controls, text=label).grid(column=2 * column, row=0, sticky=tk.W, padx=2)
+            selector = ttk.Combobox(controls, textvariable=var, values=list(STAT_LABELS), width=6, state="readonly")
+            selector.grid(column=2 * column + 1, row=0, sticky=tk.W, padx=2)
+            selector.bind("<<ComboboxSelected>>", lambda event: self.update_interaction())
+        
+        # The stat that is not on either axis, adjustable without recalculating anything else
+        self.fixed_stat_label = ttk.Label(controls, text="")
+        self.fixed_stat_label.grid(column=4, row=0, sticky=tk.W, padx=(10, 2))
+        self.fixed_stat_var = tk.DoubleVar(value=0)
+        self.fixed_stat_scale = ttk.Scale(
+            controls, orient="horizontal", length=150, variable=self.fixed_stat_var,
+            command=lambda value: self.update_interaction()
+        )
+        self.fixed_stat_scale.grid(column=5, row=0, sticky=tk.W, padx=2)
         
-        self.hac_figure = Figure(figsize=(5, 4), dpi=100)
-        self.hac_canvas = FigureCanvasTkAgg(self.hac_figure, master=self.hac_frame)
-        self.hac_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # The figure is created the first time the tab is opened
+        self.interaction_plot = None
+        self.interaction_synced = None
+    
+    def show_graph_tab(self):
+        """Draw whatever the newly selected graph tab is missing"""
+        if self.interaction_visible():
+            self.update_interaction()
+        else:
+            self.show_curve(self.visible_stat())
+    
+    def create_figure(self, master, **pack_options):
+        """New figure and Tk canvas packed into master"""
+        Figure, FigureCanvasTkAgg = load_matplotlib()
+        figure = Figure(figsize=(5, 4), dpi=100)
+        canvas = FigureCanvasTkAgg(figure, master=master)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, **pack_options)
+        return figure, canvas
+    
+    def stat_plot(self, stat):
+        """Figure and canvas of a stat-curve tab, created the first time the curve is drawn"""
+        if stat not in self.stat_figures:
+            self.curve_placeholders.pop(stat).destroy()
+            self.stat_figures[stat] = self.create_figure(self.stat_frames[stat])
+        return self.stat_figures[stat]
+    
+    def visible_stat(self):
+        """Stat of the selected curve tab, or None when another graph tab is selected"""
+        selected = self.graph_notebook.select()
+        for stat, frame in self.stat_frames.items():
+            if str(frame) == selected:
+                return stat
+        return None
+    
+    def interaction_visible(self):
+        return self.graph_notebook.select() == str(self.interaction_frame)
+    
+    def update_interaction(self):
+        """Recompute the two-stat heatmap for the Calculator tab's build and redraw it"""
+        try:
+            base_min_damage = float(self.base_min_damage_var.get())
+            base_max_damage = float(self.base_max_damage_var.get())
+            skill_heal = float(self.skill_heal_var.get()) / 100  # Convert to decimal
+            current = {"sdb": float(self.sdb_var.get()), "hac": float(self.hac_var.get()), "crit": float(self.crit_var.get())}
+        except ValueError:
+            self.fixed_stat_label.configure(text="Enter valid stats on the Calculator tab")
+            return
+        
+        x_stat = STAT_LABELS[self.interaction_x_var.get()]
+        y_stat = STAT_LABELS[self.interaction_y_var.get()]
+        if x_stat == y_stat:
+            self.fixed_stat_label.configure(text="Pick two different stats")
+            return
+        fixed_stat = next(stat for stat in current if stat not in (x_stat, y_stat))
+        
+        # The slider follows the build until it is moved; a new fixed stat or build value resets it
+        if self.interaction_synced != (fixed_stat, current[fixed_stat]):
+            self.interaction_synced = (fixed_stat, current[fixed_stat])
+            self.fixed_stat_scale.configure(from_=0, to=interaction_range(fixed_stat, current[fixed_stat])[-1])
+            self.fixed_stat_var.set(current[fixed_stat])
+        fixed_value = self.fixed_stat_var.get()
+        self.fixed_stat_label.configure(text=f"{CURVE_TABS[fixed_stat][0]}: {fixed_value:.0f}")
+        
+        stats = dict(current, **{fixed_stat: fixed_value})
+        x_values = interaction_range(x_stat, current[x_stat])
+        y_values = interaction_range(y_stat, current[y_stat])
+        with timed(self.timings, "interaction: grid"):
+            avg_heal = analyze_stat_pair(
+                base_min_damage, base_max_damage, skill_heal, stats["sdb"], stats["hac"], stats["crit"], x_stat, y_stat,
+                x_values, y_values
+            )
+            current_heal = heal_moments(base_min_damage, base_max_damage, skill_heal, stats["sdb"], stats["hac"], stats["crit"])[0]
+        with timed(self.timings, "interaction: draw"):
+            self.plot_interaction(x_stat, y_stat, x_values, y_values, avg_heal, (current[x_stat], current[y_stat]), current_heal)
+    
+    def plot_interaction(self, x_stat, y_stat, x_values, y_values, avg_heal, current_point, current_heal):
+        """Heatmap of avg_heal with iso-heal contours, the current build and the contour through it
+        
+        The image, colorbar and marker are created once and updated in place; only the
+        contours, which cannot be updated, are replaced.
+        """
+        plot = self.interaction_plot
+        if plot is None:
+            figure, canvas = self.create_figure(self.interaction_frame)
+            grid = figure.add_gridspec(1, 2, width_ratios=[20, 1])
+            ax = figure.add_subplot(grid[0])
+            image = ax.imshow(avg_heal, origin="lower", aspect="auto", cmap="viridis")
+            colorbar = figure.colorbar(image, cax=figure.add_subplot(grid[1]), label="Average Heal")
+            marker, = ax.plot([], [], 'r*', markersize=12, label='Current')
+            ax.set_title('Average Heal by Stat Pair')
+            legend = ax.legend(loc='upper right', fontsize=8)
+            plot = self.interaction_plot = {
+                "figure": figure,
+                "canvas": canvas,
+                "axes": ax,
+                "image": image,
+                "colorbar": colorbar,
+                "marker": marker,
+                "current_label": legend.get_texts()[0],
+                "contours": [],
+                "needs_layout": True
+            }
+            canvas.mpl_connect("resize_event", lambda event: plot.update(needs_layout=True))
+        ax = plot["axes"]
+        
+        extent = (x_values[0], x_values[-1], y_values[0], y_values[-1])
+        plot["image"].set_data(avg_heal)
+        plot["image"].set_extent(extent)
+        ax.set_xlim(extent[:2])
+        ax.set_ylim(extent[2:])
+        plot["image"].set_clim(avg_heal.min(), avg_heal.max())
+        plot["colorbar"].update_normal(plot["image"])
+        plot["marker"].set_data([current_point[0]], [current_point[1]])
+        plot["current_label"].set_text(f'Current ({current_heal:.0f})')
+        ax.set_xlabel(CURVE_TABS[x_stat][0])
+        ax.set_ylabel(CURVE_TABS[y_stat][0])
+        
+        for contour in plot["contours"]:
+            contour.remove()
+        contours = ax.contour(x_values, y_values, avg_heal, levels=10, colors="white", linewidths=0.7, alpha=0.8)
+        ax.clabel(contours, fmt="%.0f", fontsize=7)
+        plot["contours"] = [contours]
+        # Builds on the dashed line heal as much as the current one (with the fixed stat as set)
+        if avg_heal.min() < current_heal < avg_heal.max():
+            plot["contours"].append(
+                ax.contour(x_values, y_values, avg_heal, levels=[current_heal], colors="red", linestyles="--", linewidths=1.2)
+            )
+        
+        if plot["needs_layout"]:
+            plot["figure"].tight_layout()
+            plot["needs_layout"] = False
+        plot["canvas"].draw_idle()
+    
+    def setup_optimizer_ui(self):
+        """Set up the stat budget optimizer tab"""
+        budget_frame = ttk.LabelFrame(self.optimizer_frame, text="Stat Budget", padding="10")
+        budget_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(budget_frame, text="Total SDB + HAC + Crit:").grid(column=0, row=0, sticky=tk.W, padx=5, pady=2)
+        self.budget_var = tk.StringVar(value="")
+        ttk.Entry(budget_frame, width=10, textvariable=self.budget_var).grid(column=1, row=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Button(budget_frame, text="Use Current Stats", command=self.use_current_budget).grid(column=2, row=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Label(budget_frame, text="Base damage and skill heal come from the Calculator tab", foreground="blue").grid(
+            column=3, row=0, columnspan=3, sticky=tk.W, padx=5, pady=2
+        )
+        
+        # Optional per-stat bounds; blank means anywhere from 0 to the whole budget
+        ttk.Label(budget_frame, text="Min").grid(column=1, row=1, sticky=tk.W, padx=5, pady=2)
+        ttk.Label(budget_frame, text="Max").grid(column=2, row=1, sticky=tk.W, padx=5, pady=2)
+        self.bound_vars = {}
+        for row, (stat, label) in enumerate([("sdb", "Skill Damage Boost:"), ("hac", "Heavy Attack Chance:"), ("crit", "Crit Chance:")], start=2):
+            ttk.Label(budget_frame, text=label).grid(column=0, row=row, sticky=tk.W, padx=5, pady=2)
+            self.bound_vars[stat] = (tk.StringVar(value=""), tk.StringVar(value=""))
+            for column, var in enumerate(self.bound_vars[stat], start=1):
+                ttk.Entry(budget_frame, width=10, textvariable=var).grid(column=column, row=row, sticky=tk.W, padx=5, pady=2)
+        
+        ttk.Label(budget_frame, text="Grid Step:").grid(column=0, row=5, sticky=tk.W, padx=5, pady=2)
+        self.step_var = tk.StringVar(value="")
+        ttk.Entry(budget_frame, width=10, textvariable=self.step_var).grid(column=1, row=5, sticky=tk.W, padx=5, pady=2)
+        ttk.Label(budget_frame, text="Optional; blank tries about 31,000 splits", foreground="blue").grid(
+            column=2, row=5, columnspan=2, sticky=tk.W, padx=5, pady=2
+        )
+        
+        ttk.Button(budget_frame, text="Optimize", command=self.run_optimizer).grid(column=0, row=6, columnspan=2, sticky=tk.W, padx=5, pady=10)
+        
+        # Best split and frontier on the left, frontier plot on the right
+        output_frame = ttk.LabelFrame(self.optimizer_frame, text="Results", padding="10")
+        output_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        text_frame = ttk.Frame(output_frame)
+        text_frame.pack(side=tk.LEFT, fill=tk.BOTH)
+        self.optimizer_text = tk.Text(text_frame, wrap=tk.NONE, width=50, height=20, font=("Courier", 10))
+        self.optimizer_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(text_frame, orient="vertical", command=self.optimizer_text.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.optimizer_text.configure(yscrollcommand=scrollbar.set)
+        
+        # The frontier plot is created on the first run
+        self.optimizer_output_frame = output_frame
+        self.optimizer_figure = None
+        self.optimizer_canvas = None
+    
+    def use_current_budget(self):
+        try:
+            budget = float(self.sdb_var.get()) + float(self.hac_var.get()) + float(self.crit_var.get())
+            self.budget_var.set(f"{budget:g}")
+        except ValueError:
+            messagebox.showerror("Error", "Please enter valid stats on the Calculator tab")
+    
+    def run_optimizer(self):
+        try:
+            base_min_damage = float(self.base_min_damage_var.get())
+            base_max_damage = float(self.base_max_damage_var.get())
+            skill_heal = float(self.skill_heal_var.get()) / 100  # Convert to decimal
+            current = {"sdb": float(self.sdb_var.get()), "hac": float(self.hac_var.get()), "crit": float(self.crit_var.get())}
+            
+            budget_text = self.budget_var.get().strip()
+            budget = float(budget_text) if budget_text else sum(current.values())
+            if budget <= 0:
+                raise ValueError("The stat budget must be positive")
+            
+            bounds = []
+            for stat in ["sdb", "hac", "crit"]:
+                low, high = (var.get().strip() for var in self.bound_vars[stat])
+                bounds.append((float(low) if low else 0, float(high) if high else budget))
+            
+            step_text = self.step_var.get().strip()
+            step = float(step_text) if step_text else None
+            if step is not None and step <= 0:
+                raise ValueError("The grid step must be positive")
+            
+            optimization = optimize_stats(base_min_damage, base_max_damage, skill_heal, budget, bounds, step)
+            current["avg_heal"], current["std_heal"] = heal_moments(
+                base_min_damage, base_max_damage, skill_heal, current["sdb"], current["hac"], current["crit"]
+            )
+            
+            self.display_optimization(optimization, current)
+            self.plot_optimization(optimization, current)
         
-        self.crit_figure = Figure(figsize=(5, 4), dpi=100)
-        self.crit_canvas = FigureCanvasTkAgg(self.crit_figure, master=self.crit_frame)
-        self.crit_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        except ValueError as e:
+            self.optimizer_text.delete(1.0, tk.END)
+            self.optimizer_text.insert(tk.END, f"Error: {str(e)}\nPlease enter valid numbers for all fields.")
+    
+    def display_optimization(self, optimization, current):
+        best = optimization["best"]
+        gain = best["avg_heal"] - current["avg_heal"]
+        
+        self.optimizer_text.delete(1.0, tk.END)
+        self.optimizer_text.insert(tk.END, "BEST SPLIT OF THE BUDGET\n")
+        self.optimizer_text.insert(tk.END, f"{optimization['candidates']:,} splits of {optimization['budget']:,.0f} tried (step {optimization['step']:.2f})\n\n")
+        self.optimizer_text.insert(tk.END, f"  SDB: {best['sdb']:.0f}   HAC: {best['hac']:.0f}   Crit: {best['crit']:.0f}\n")
+        self.optimizer_text.insert(tk.END, f"  Average Heal: {best['avg_heal']:.2f} (std dev {best['std_heal']:.2f})\n\n")
+        self.optimizer_text.insert(tk.END, "Current stats:\n")
+        self.optimizer_text.insert(tk.END, f"  SDB: {current['sdb']:.0f}   HAC: {current['hac']:.0f}   Crit: {current['crit']:.0f}\n")
+        self.optimizer_text.insert(tk.END, f"  Average Heal: {current['avg_heal']:.2f} (std dev {current['std_heal']:.2f})\n")
+        self.optimizer_text.insert(tk.END, f"  Re-allocating gains {gain:+.2f} ({gain / current['avg_heal'] * 100:+.2f}%)\n\n")
+        
+        # Each frontier split is the most healing available at its level of spread
+        self.optimizer_text.insert(tk.END, "PARETO FRONTIER (avg heal vs consistency)\n")
+        self.optimizer_text.insert(tk.END, f"{'SDB':>6} {'HAC':>6} {'Crit':>6} {'Avg Heal':>10} {'Std Dev':>9}\n")
+        frontier = optimization["frontier"]
+        for i in np.unique(np.linspace(0, len(frontier) - 1, min(15, len(frontier))).astype(int)):
+            point = frontier[i]
+            self.optimizer_text.insert(
+                tk.END, f"{point['sdb']:6.0f} {point['hac']:6.0f} {point['crit']:6.0f} {point['avg_heal']:10.2f} {point['std_heal']:9.2f}\n"
+            )
+    
+    def plot_optimization(self, optimization, current):
+        if self.optimizer_figure is None:
+            self.optimizer_figure, self.optimizer_canvas = self.create_figure(self.optimizer_output_frame, side=tk.RIGHT, padx=5)
+        self.optimizer_figure.clear()
+        ax = self.optimizer_figure.add_subplot(111)
+        
+        # Every candidate split, the frontier through them, and the two splits of interest
+        points = optimization["points"]
+        ax.scatter(points["std_heal"], points["avg_heal"], s=2, c=points["hac"], cmap="viridis", alpha=0.3)
+        frontier = optimization["frontier"]
+        ax.plot([p["std_heal"] for p in frontier], [p["avg_heal"] for p in frontier], 'b-', label='Pareto Frontier')
+        best = optimization["best"]
+        ax.plot(best["std_heal"], best["avg_heal"], 'g*', markersize=14, label='Best')
+        ax.plot(current["std_heal"], current["avg_heal"], 'ro', label='Current')
+        
+        ax.set_xlabel('Heal Std Dev (lower is more consistent)')
+        ax.set_ylabel('Average Heal')
+        ax.set_title('Stat Budget Splits (color: HAC share)')
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc='lower right')
+        
+        self.optimizer_figure.tight_layout()
+        self.optimizer_canvas.draw()
+    
+    def setup_skills_ui(self):
+        """Set up the tab that evaluates the skill table for the current build"""
+        table_frame = ttk.LabelFrame(self.skills_frame, text="Skill Table", padding="10")
+        table_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(table_frame, text=SKILLS_PATH).grid(column=0, row=0, columnspan=2, sticky=tk.W, padx=5, pady=2)
+        ttk.Button(table_frame, text="Reload", command=self.load_skill_table).grid(column=2, row=0, sticky=tk.W, padx=5, pady=2)
+        
+        # Skills to compare; with none selected every skill is evaluated
+        self.skill_listbox = tk.Listbox(table_frame, selectmode=tk.EXTENDED, height=6, exportselection=False)
+        self.skill_listbox.grid(column=0, row=1, rowspan=2, sticky=tk.W, padx=5, pady=2)
+        ttk.Button(table_frame, text="Evaluate Skills", command=self.run_skill_evaluation).grid(column=1, row=1, sticky=tk.W, padx=5, pady=2)
+        ttk.Label(table_frame, text="Evaluates the selected skills (or all of them) with the Calculator tab's stats and mode", foreground="blue").grid(
+            column=1, row=2, columnspan=2, sticky=tk.W, padx=5, pady=2
+        )
+        
+        output_frame = ttk.LabelFrame(self.skills_frame, text="Results", padding="10")
+        output_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.skills_text = tk.Text(output_frame, wrap=tk.NONE, height=20, font=("Courier", 10))
+        self.skills_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(output_frame, orient="vertical", command=self.skills_text.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.skills_text.configure(yscrollcommand=scrollbar.set)
+        
+        self.load_skill_table()
+    
+    def load_skill_table(self):
+        """(Re)read the skill table into the selector"""
+        self.skills_text.delete(1.0, tk.END)
+        self.skill_listbox.delete(0, tk.END)
+        try:
+            self.skills = load_skills()
+        except (OSError, ValueError, KeyError) as e:
+            self.skills = []
+            self.skills_text.insert(tk.END, f"Error: cannot read the skill table: {e}\n")
+            return
+        for skill in self.skills:
+            self.skill_listbox.insert(tk.END, skill["name"])
+    
+    def run_skill_evaluation(self):
+        try:
+            base_min_damage = float(self.base_min_damage_var.get())
+            base_max_damage = float(self.base_max_damage_var.get())
+            skill_heal = float(self.skill_heal_var.get()) / 100  # Convert to decimal
+            sdb = float(self.sdb_var.get())
+            hac = float(self.hac_var.get())
+            crit = float(self.crit_var.get())
+            mode = self.get_calculation_mode()
+            rolls = roll_stream(int(self.custom_trials_var.get()), self.get_seed()) if mode == "monte_carlo" else None
+        except ValueError as e:
+            self.skills_text.delete(1.0, tk.END)
+            self.skills_text.insert(tk.END, f"Error: {str(e)}\nPlease enter valid numbers on the Calculator tab.")
+            return
+        
+        selected = self.skill_listbox.curselection()
+        skills = [self.skills[i] for i in selected] if selected else self.skills
+        if not skills:
+            return
+        
+        # Every skill in one pass over the build's multipliers (and, simulated, over the same rolls)
+        with timed(self.timings, "skills: evaluate"):
+            evaluation = evaluate_skills(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, skills, mode, rolls)
+        self.display_skill_evaluation(evaluation)
+    
+    def display_skill_evaluation(self, evaluation):
+        self.skills_text.delete(1.0, tk.END)
+        self.skills_text.insert(tk.END, "SKILLS RANKED BY AVERAGE HEAL\n\n")
+        self.skills_text.insert(tk.END, f"{'Skill':<30} {'Avg Heal':>10} {'Min Heal':>10} {'Max Heal':>10} {'Crit %':>7} {'HAC %':>7}\n")
+        for i in np.argsort(-evaluation["avg_heal"], kind="stable"):
+            self.skills_text.insert(
+                tk.END,
+                f"{evaluation['name'][i]:<30} {evaluation['avg_heal'][i]:10.2f} {evaluation['min_heal'][i]:10.2f} "
+                f"{evaluation['max_heal'][i]:10.2f} {evaluation['crit_percentage'][i]:7.2f} {evaluation['hac_percentage'][i]:7.2f}\n"
+            )
+        if "avg_heal_ci" in evaluation:
+            self.skills_text.insert(tk.END, f"\n{evaluation['trials'][0]:,} trials shared by every skill\n")
+    
+    def setup_explorer_ui(self):
+        """Set up the tab that searches every combination of the rune catalog for the current build"""
+        catalog_frame = ttk.LabelFrame(self.explorer_frame, text="Rune Catalog", padding="10")
+        catalog_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(catalog_frame, text=RUNES_PATH).grid(column=0, row=0, columnspan=4, sticky=tk.W, padx=5, pady=2)
+        ttk.Button(catalog_frame, text="Reload", command=self.load_rune_catalog).grid(column=4, row=0, sticky=tk.W, padx=5, pady=2)
+        
+        ttk.Label(catalog_frame, text="Runes:").grid(column=0, row=1, sticky=tk.W, padx=5, pady=2)
+        self.explore_runes_var = tk.StringVar(value="")
+        ttk.Entry(catalog_frame, width=6, textvariable=self.explore_runes_var).grid(column=1, row=1, sticky=tk.W, padx=5, pady=2)
+        ttk.Label(catalog_frame, text="Top:").grid(column=2, row=1, sticky=tk.W, padx=5, pady=2)
+        self.explore_top_var = tk.StringVar(value="10")
+        ttk.Entry(catalog_frame, width=6, textvariable=self.explore_top_var).grid(column=3, row=1, sticky=tk.W, padx=5, pady=2)
+        ttk.Button(catalog_frame, text="Explore", command=self.run_rune_exploration).grid(column=4, row=1, sticky=tk.W, padx=5, pady=2)
+        ttk.Label(catalog_frame, text="Ranks every legal combination of that many runes (default: every slot filled) on the Calculator tab's stats and mode", foreground="blue").grid(
+            column=0, row=2, columnspan=5, sticky=tk.W, padx=5, pady=2
+        )
+        
+        output_frame = ttk.LabelFrame(self.explorer_frame, text="Results", padding="10")
+        output_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.explorer_text = tk.Text(output_frame, wrap=tk.NONE, height=20, font=("Courier", 10))
+        self.explorer_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(output_frame, orient="vertical", command=self.explorer_text.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.explorer_text.configure(yscrollcommand=scrollbar.set)
+        
+        self.load_rune_catalog()
+    
+    def load_rune_catalog(self):
+        """(Re)read the rune catalog and show what it holds"""
+        self.explorer_text.delete(1.0, tk.END)
+        try:
+            self.rune_slots, self.rune_catalog = read_rune_catalog()
+        except (OSError, ValueError, KeyError) as e:
+            self.rune_slots, self.rune_catalog = {}, []
+            self.explorer_text.insert(tk.END, f"Error: cannot read the rune catalog: {e}\n")
+            return
+        slots = ", ".join(f"{slot} x{capacity}" for slot, capacity in self.rune_slots.items())
+        self.explorer_text.insert(tk.END, f"{len(self.rune_catalog)} runes for slots {slots}\n")
+    
+    def run_rune_exploration(self):
+        try:
+            base_min_damage = float(self.base_min_damage_var.get())
+            base_max_damage = float(self.base_max_damage_var.get())
+            skill_heal = float(self.skill_heal_var.get()) / 100  # Convert to decimal
+            sdb = float(self.sdb_var.get())
+            hac = float(self.hac_var.get())
+            crit = float(self.crit_var.get())
+            rune_count = int(self.explore_runes_var.get()) if self.explore_runes_var.get().strip() else sum(self.rune_slots.values())
+            top = int(self.explore_top_var.get())
+            mode = self.get_calculation_mode()
+            rolls = roll_stream(int(self.custom_trials_var.get()), self.get_seed()) if mode == "monte_carlo" else None
+        except ValueError as e:
+            self.explorer_text.delete(1.0, tk.END)
+            self.explorer_text.insert(tk.END, f"Error: {str(e)}\nPlease enter valid numbers here and on the Calculator tab.")
+            return
+        if not self.rune_catalog:
+            return
+        
+        try:
+            exploration = explore_runes(
+                base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, self.rune_slots, self.rune_catalog, rune_count,
+                top, mode, rolls, self.timings
+            )
+        except ValueError as e:
+            self.explorer_text.delete(1.0, tk.END)
+            self.explorer_text.insert(tk.END, f"Error: {str(e)}")
+            return
+        self.display_rune_exploration(exploration)
+    
+    def display_rune_exploration(self, exploration):
+        self.explorer_text.delete(1.0, tk.END)
+        self.explorer_text.insert(tk.END, "BEST RUNE COMBINATIONS\n\n")
+        self.explorer_text.insert(tk.END, f"Combinations: {exploration['combinations']:,} ({exploration['evaluated']:,} evaluated after pruning)\n")
+        self.explorer_text.insert(tk.END, f"Base Stats: Average Heal = {exploration['base_avg_heal']:.2f}\n\n")
+        for rank, build in enumerate(exploration["top"], 1):
+            gain = f"{build['gain']:+.2f}"
+            if "gain_se" in build:
+                gain += f" ± {1.96 * build['gain_se']:.2f}, 95% CI"
+            self.explorer_text.insert(tk.END, f"#{rank}: Average Heal = {build['avg_heal']:.2f} (gain vs base {gain})\n")
+            self.explorer_text.insert(
+                tk.END,
+                f"    Skill Heal {build['skill_heal'] * 100:.2f}% / SDB {build['sdb']:.0f} / HAC {build['hac']:.0f} / Crit {build['crit']:.0f}\n"
+            )
+            self.explorer_text.insert(tk.END, f"    Runes: {', '.join(build['runes'])}\n\n")
+    
+    def setup_diagnostics_ui(self):
+        """Set up the stage timing diagnostics tab"""
+        controls_frame = ttk.LabelFrame(self.diagnostics_frame, text="Instrumentation", padding="10")
+        controls_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.diagnostics_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(controls_frame, text="Record stage timings", variable=self.diagnostics_var, command=self.toggle_diagnostics).grid(
+            column=0, row=0, sticky=tk.W, padx=5, pady=2
+        )
+        ttk.Button(controls_frame, text="Reset", command=self.reset_diagnostics).grid(column=1, row=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Button(controls_frame, text="Refresh", command=self.refresh_diagnostics).grid(column=2, row=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Label(controls_frame, text="Times the simulations, sweeps and plots of each Calculate press", foreground="blue").grid(
+            column=3, row=0, sticky=tk.W, padx=5, pady=2
+        )
+        
+        output_frame = ttk.LabelFrame(self.diagnostics_frame, text="Timings", padding="10")
+        output_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.diagnostics_text = tk.Text(output_frame, wrap=tk.NONE, height=20, font=("Courier", 10))
+        self.diagnostics_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(output_frame, orient="vertical", command=self.diagnostics_text.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.diagnostics_text.configure(yscrollcommand=scrollbar.set)
+        
+        self.refresh_diagnostics()
+    
+    def toggle_diagnostics(self):
+        """Start recording into fresh timings, or stop recording"""
+        self.timings = StageTimings() if self.diagnostics_var.get() else None
+        self.refresh_diagnostics()
+    
+    def reset_diagnostics(self):
+        if self.timings is not None:
+            self.timings.clear()
+        self.refresh_diagnostics()
+    
+    def refresh_diagnostics(self):
+        """Show the recorded stage timings and counters"""
+        self.diagnostics_text.delete(1.0, tk.END)
+        if self.timings is None:
+            self.diagnostics_text.insert(tk.END, "Stage timings are off. Tick 'Record stage timings', then press Calculate.\n")
+            return
+        self.diagnostics_text.insert(tk.END, format_timings(self.timings.report()))
+        self.diagnostics_text.insert(
+            tk.END, f"\n\nResult cache: {len(self.result_cache)} entries, {self.result_cache.hits} hits, {self.result_cache.misses} misses in total\n"
+        )
     
     def setup_documentation_ui(self):
         """Set up the documentation tab with explanation of calculations and formulas"""
@@ -436,13 +1033,14 @@ Max Heal = Max Skill Damage × (1 + Effective SDB) × (1 + Skill Heal%)\n\n""",
 • Critical hits guarantee maximum healing value
 • Heavy attacks double healing output
 • Both can occur simultaneously for maximum effect\n\n""", "normal")
+        self.doc_text.insert(tk.END, """With Paired comparison enabled, every build is simulated on the same random draws. The ± value after each percentage is the 95% CI half-width of that build's gain over Base Stats, so small differences between runes are reliable even at modest trial counts.\n\n""", "normal")
         
         # Usage Guide
         self.doc_text.insert(tk.END, "How to Use the Calculator\n", "heading2")
         self.doc_text.insert(tk.END, """1. Enter your base character stats
 2. Configure runes you want to compare
-3. Adjust the number of simulation trials (more trials = more accurate results but slower performance)
-4. Click "Calculate" to run the simulation
+3. Adjust the number of simulation trials (more trials = more accurate results)
+4. Click "Calculate" to run the simulation (results appear as each build finishes; "Cancel" stops a long run, and pressing "Calculate" again replaces it)
 5. Review ranked results and examine effectiveness curves\n\n""", "normal")
         
         # Graph Interpretation
@@ -452,21 +1050,72 @@ Max Heal = Max Skill Damage × (1 + Effective SDB) × (1 + Skill Heal%)\n\n""",
 • Bottom Graph: Effective percentage of the stat based on MaxRoll formula
 • Vertical Lines: Your current value (red) and soft cap (orange)
 
-The curves help visualize diminishing returns, showing where additional stat points give less benefit.\n\n""", "normal")
+The curves help visualize diminishing returns, showing where additional stat points give less benefit. The purple Heal per Point line is the exact heal each extra point adds, worked out from the formulas rather than from the simulated curve, so it stays smooth at any trial count.\n\n""", "normal")
         
         # Advanced Settings
         self.doc_text.insert(tk.END, "Advanced Settings\n", "heading2")
         self.doc_text.insert(tk.END, """Use the simulation controls to balance accuracy vs. performance:
 • Default: 10,000 trials (good balance)
 • Minimum: 1,000 trials (faster but less accurate)
-• Maximum: 100,000 trials (very accurate but may slow down older computers)\n\n""", "normal")
-        
-        self.doc_text.insert(tk.END, """Warning: Setting trials above 100,000 may cause significant performance issues on some systems.\n""", "warning")
+• Slider maximum: 1,000,000 trials (very accurate and still fast)\n\n""", "normal")
+
+        self.doc_text.insert(tk.END, """Target Precision replaces guessing a trial count: enter the 95% confidence half-width you want (in heal) and each build is simulated in chunks until it is reached, up to 5,000,000 trials. With Paired comparison on, the target applies to each rune's gain over Base Stats, so clear winners stop early and close calls get more samples. Each result lists the trials it used and its achieved precision.\n\n""", "normal")
+
+        self.doc_text.insert(tk.END, """Enter a Seed to make Monte Carlo results reproducible: the same seed and number of Worker Processes always give identical results. More worker processes split the trials across CPU cores, which helps for runs of millions of trials.\n\n""", "normal")
+
+        self.doc_text.insert(tk.END, """The Calculation Mode selector switches between Monte Carlo simulation and the Analytic (exact) mode. Analytic mode computes the expected heal, proc chances and percentiles directly from the formulas above, so it ignores the trial count and has no sampling noise.\n\n""", "normal")
+
+        self.doc_text.insert(tk.END, """The Optimizer tab answers a bigger question than the runes: given a total of SDB + HAC + Crit, which split heals the most? It scores tens of thousands of splits exactly, with the same diminishing-returns formulas, optionally within per-stat Min/Max bounds. Besides the best split it lists the Pareto frontier: the splits that heal the most for a given spread (standard deviation) of heals, for players who prefer steadier heals over the highest average.\n\n""", "normal")
+
+        self.doc_text.insert(tk.END, """Results are cached: recalculating with the same Seed (or in Analytic mode) reuses every build, gain and stat curve that has not changed, so changing one rune slot only computes that rune. Tick Remember results between sessions to keep the cache on disk, and use Clear Cache to start fresh. Without a seed every run draws new random numbers, so nothing is reused.\n\n""", "normal")
+        self.doc_text.insert(tk.END, """The Stat Interaction tab maps the exact average heal over two stats at once (pick them with X and Y), so trade-offs such as crit against HAC show up. White lines join builds that heal the same, the star is your build and the red dashed line runs through every pair that heals as much as it. The slider sets the third stat; it follows your build until you move it.\n\n""", "normal")
+        self.doc_text.insert(tk.END, """Tick Live update to recalculate whenever a stat, rune or setting changes, without pressing Calculate. It waits until you stop typing, skips fields that are not valid numbers yet, and in Monte Carlo mode shows the exact analytic averages at once while the simulation refines them; any change cancels a refinement still running for the old values.\n\n""", "normal")
+        self.doc_text.insert(tk.END, """The stat curve on the visible tab is computed and drawn first; the other two are computed in the background and drawn when you open their tab. The curves depend only on the base stats, mode and seed, so pressing Calculate after changing only runes leaves them as they are.\n\n""", "normal")
+
+        self.doc_text.insert(tk.END, """The Skills tab ranks every skill of the skill table (skills.json next to the program) for the Calculator tab's stats, all in one pass. Each skill lists its damage coefficient, flat bonus and whether it can crit or trigger Heavy Attack; add your own skills there and press Reload.\n\n""", "normal")
+        self.doc_text.insert(tk.END, """If a calculation feels slow, tick Record stage timings on the Diagnostics tab and press Calculate. It lists how long the build simulations, the three stat sweeps, and each curve's layout and drawing took, with the trials simulated and cache hits. Recording is off by default and costs nothing while off.\n\n""", "normal")
+
+        self.doc_text.insert(tk.END, """Trials are simulated in fixed-size chunks and only running totals and a heal histogram are kept, so memory use stays the same at any trial count.\n\n""", "normal")
+
+        self.doc_text.insert(tk.END, """Warning: Custom values above 5,000,000 trials take several seconds per build.\n""", "warning")
         
         # Make the text read-only
         self.doc_text.configure(state="disabled")
     
-    def calculate_comparison(self):
+    def setup_live_updates(self):
+        """Trace every input the results depend on; rune names only relabel them"""
+        inputs = [
+            self.base_min_damage_var, self.base_max_damage_var, self.skill_heal_var, self.sdb_var, self.hac_var,
+            self.crit_var, self.custom_trials_var, self.mode_var, self.paired_var, self.target_ci_var, self.seed_var,
+            self.workers_var, self.live_update_var
+        ]
+        inputs += self.rune_enabled_vars + self.rune_type_vars + self.rune_value_vars
+        for var in inputs:
+            var.trace_add("write", self.schedule_live_update)
+    
+    def schedule_live_update(self, *args):
+        """Restart the debounce timer, so a burst of keystrokes triggers one calculation
+        
+        A refinement still running for the old inputs is stale, so it is cancelled right away.
+        """
+        if self.live_update_after is not None:
+            self.root.after_cancel(self.live_update_after)
+            self.live_update_after = None
+        if not self.live_update_var.get():
+            return
+        self.cancel_calculation("Waiting for input...")
+        self.live_update_after = self.root.after(LIVE_UPDATE_DELAY_MS, self.live_update)
+    
+    def live_update(self):
+        self.live_update_after = None
+        self.calculate_comparison(live=True)
+    
+    def calculate_comparison(self, live=False):
+        """Compare the base build with each enabled rune in the background
+        
+        A live update skips invalid or half-typed input quietly and, in Monte Carlo
+        mode, shows exact analytic averages first while the simulation refines them.
+        """
         try:
             # Get trials count
             trials = int(self.custom_trials_var.get())
@@ -479,21 +1128,25 @@ The curves help visualize diminishing returns, showing where additional stat poi
             hac = float(self.hac_var.get())
             crit = float(self.crit_var.get())
             
+            mode = self.get_calculation_mode()
+            target_ci = self.get_target_precision()
+            
             # Warn if trials are very high
-            if trials > 100000:
+            if mode == "monte_carlo" and trials > 5000000:
+                if live:
+                    self.status_var.set(f"Press Calculate to run {trials:,} trials")
+                    return
                 result = messagebox.askyesno(
                     "Performance Warning", 
-                    f"You are about to run {trials:,} trials, which may cause slowdowns. Continue anyway?"
+                    f"You are about to run {trials:,} trials, which takes several seconds per build. Continue anyway?"
                 )
                 if not result:
                     return
             
-            # Calculate base case
-            base_result = calculate_heal(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, trials)
-            
-            results = {"Base Stats": base_result}
+            # (skill_heal, sdb, hac, crit) for the base case and each enabled rune
+            builds = {"Base Stats": (skill_heal, sdb, hac, crit)}
             
-            # Calculate results for each enabled rune
+            # Collect results for each enabled rune
             for i in range(4):
                 if self.rune_enabled_vars[i].get():
                     rune_type = self.rune_type_vars[i].get()
@@ -522,23 +1175,171 @@ The curves help visualize diminishing returns, showing where additional stat poi
                     elif rune_type == "Skill Heal":
                         new_skill_heal += rune_value / 100  # Convert to decimal
                     
-                    # Calculate with rune
-                    rune_result = calculate_heal(base_min_damage, base_max_damage, new_skill_heal, new_sdb, new_hac, new_crit, trials)
-                    results[rune_name] = rune_result
-            
-            # Display results
-            self.display_results(results)
+                    builds[rune_name] = (new_skill_heal, new_sdb, new_hac, new_crit)
             
-            # Analyze stat effectiveness curves
-            self.analyze_and_display_stat_curves(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit)
+            paired = self.paired_var.get()
+            seed = self.get_seed()
+            workers = self.get_workers()
             
         except ValueError as e:
+            if live:
+                self.status_var.set("Waiting for valid input...")
+                return
             self.results_text.delete(1.0, tk.END)
             self.results_text.insert(tk.END, f"Error: {str(e)}\nPlease enter valid numbers for all fields.")
+            return
+        
+        # The sweeps depend only on the base build and how it is sampled, so rune edits keep them.
+        # A seed draws different rolls for different worker counts, so workers is part of the key,
+        # as in iter_stat_sweeps' own cache key. The sweeps use their default trial count.
+        # The visible tab's sweep runs first and the others follow in the background.
+        curve_key = cache_key(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, mode, seed, workers)
+        visible = self.visible_stat()
+        curve_stats = [
+            stat for stat in sorted(self.stat_frames, key=lambda stat: stat != visible)
+            if self.curve_data.get(stat, (None,))[0] != curve_key
+        ]
+        
+        # The heatmap is exact and quick, so an open one is simply redrawn
+        if self.interaction_visible():
+            self.update_interaction()
+        
+        # A new press supersedes whatever is still running
+        self.cancel_calculation()
+        self.job_id += 1
+        self.cancel_event = threading.Event()
+        self.job_results = {}
+        self.job_estimates = {}
+        self.job_curves = 0
+        
+        self.progress_bar.configure(maximum=len(builds) + len(curve_stats), value=0)
+        self.status_var.set("Calculating...")
+        self.job_started = time.perf_counter()
+        self.cancel_button.state(["!disabled"])
+        
+        worker = threading.Thread(
+            target=self.run_comparison_job,
+            args=(
+                self.job_id, self.cancel_event, base_min_damage, base_max_damage, builds, trials, mode, paired, target_ci, seed, workers,
+                curve_key, curve_stats, live and mode == "monte_carlo"
+            ),
+            daemon=True
+        )
+        worker.start()
+        
+        if not self.polling_jobs:
+            self.polling_jobs = True
+            self.root.after(50, self.process_job_messages)
+    
+    def run_comparison_job(self, job_id, cancel_event, base_min_damage, base_max_damage, builds, trials, mode, paired, target_ci, seed, workers, curve_key, curve_stats, estimate=False):
+        """Worker thread body: post each finished build, then each of curve_stats' sweeps, to the job queue
+        
+        With estimate, exact analytic results and curves are posted first; they take
+        milliseconds, and the simulated ones replace them as they finish.
+        """
+        timings = self.timings
+        hits, misses = self.result_cache.hits, self.result_cache.misses
+        skill_heal, sdb, hac, crit = builds["Base Stats"]
+        current_values = {"sdb": sdb, "hac": hac, "crit": crit}
+        try:
+            if estimate:
+                with timed(timings, "comparison: estimate"):
+                    estimates = compare_builds(
+                        base_min_damage, base_max_damage, builds, "Base Stats", "analytic", cache=self.result_cache
+                    )
+                    estimate_key = cache_key(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, "analytic", seed)
+                    sweeps = iter_stat_sweeps(
+                        base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, curve_stats, mode="analytic",
+                        cache=self.result_cache
+                    )
+                    curves = {stat: (estimate_key, analysis, current_values[stat]) for stat, analysis in sweeps}
+                if cancel_event.is_set():
+                    return
+                self.job_queue.put((job_id, "estimate", (estimates, curves)))
+            
+            with timed(timings, "comparison: total"):
+                results = iter_comparison(
+                    base_min_damage, base_max_damage, builds, trials, mode, paired, target_ci, "Base Stats", seed=seed,
+                    workers=workers, cache=self.result_cache, timings=timings
+                )
+                for name, result in results:
+                    if cancel_event.is_set():
+                        return
+                    self.job_queue.put((job_id, "build", (name, result)))
+            
+            sweeps = iter_stat_sweeps(
+                base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, curve_stats, mode=mode, seed=seed,
+                workers=workers, cache=self.result_cache, timings=timings
+            )
+            for stat, analysis in sweeps:
+                if cancel_event.is_set():
+                    return
+                self.job_queue.put((job_id, "curve", (stat, curve_key, analysis, current_values[stat])))
+            count_event(timings, "cache hits", self.result_cache.hits - hits)
+            count_event(timings, "cache misses", self.result_cache.misses - misses)
+            self.result_cache.save()
+            self.job_queue.put((job_id, "done", None))
+        except Exception as e:
+            self.job_queue.put((job_id, "error", e))
+    
+    def process_job_messages(self):
+        """Apply messages from the worker on the Tk thread, dropping ones from superseded jobs"""
+        while True:
+            try:
+                job_id, kind, payload = self.job_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            if job_id != self.job_id:
+                continue
+            
+            if kind == "build":
+                # Stream partial results in as each build finishes
+                name, result = payload
+                self.job_results[name] = result
+                self.display_results({**self.job_estimates, **self.job_results})
+                self.progress_bar.configure(value=len(self.job_results))
+                self.status_var.set(f"Finished {name}")
+            elif kind == "estimate":
+                self.job_estimates, curves = payload
+                self.display_results(self.job_estimates)
+                for stat, curve in curves.items():
+                    self.store_curve(stat, *curve)
+                self.status_var.set("Exact averages shown, refining...")
+            elif kind == "curve":
+                self.store_curve(*payload)
+                self.job_curves += 1
+                self.progress_bar.configure(value=len(self.job_results) + self.job_curves)
+            elif kind == "done":
+                self.finish_job(f"Done (cache: {self.result_cache.hits} hits, {self.result_cache.misses} misses)")
+                if self.timings is not None:
+                    self.timings.add("calculate: press to done", time.perf_counter() - self.job_started)
+                    self.refresh_diagnostics()
+            elif kind == "error":
+                self.finish_job("Failed")
+                self.results_text.insert(tk.END, f"\nError: {payload}\n")
+        
+        if self.cancel_event is not None:
+            self.root.after(50, self.process_job_messages)
+        else:
+            self.polling_jobs = False
+    
+    def cancel_calculation(self, status="Cancelled"):
+        """Stop the running job, if any; its late messages are ignored"""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.finish_job(status)
+    
+    def finish_job(self, status):
+        self.cancel_event = None
+        self.cancel_button.state(["disabled"])
+        self.status_var.set(status)
     
     def display_results(self, results):
-        # Sort results by average heal (descending)
-        sorted_results = sorted(results.items(), key=lambda x: x[1]['avg_heal'], reverse=True)
+        # Sort results by average heal (descending), or by paired gain when builds were paired
+        # (a live update's table mixes paired results with the analytic estimates they replace)
+        rank_key = "gain" if all("gain" in result for result in results.values()) else "avg_heal"
+        sorted_results = sorted(results.items(), key=lambda x: x[1][rank_key], reverse=True)
         
         # Clear previous results
         self.results_text.delete(1.0, tk.END)
@@ -555,6 +1356,11 @@ The curves help visualize diminishing returns, showing where additional stat poi
                 base_heal = results["Base Stats"]["avg_heal"]
                 increase = ((data['avg_heal'] - base_heal) / base_heal) * 100
                 percent_increase = f" (+{increase:.2f}%)"
+                if "gain_se" in data:
+                    # Paired gain and its 95% CI, like the average heal's below, relative to the base heal
+                    increase = (data['gain'] / base_heal) * 100
+                    increase_ci = (1.96 * data['gain_se'] / base_heal) * 100
+                    percent_increase = f" (+{increase:.2f}% ± {increase_ci:.2f}%, 95% CI)"
             
             self.results_text.insert(tk.END, f"#{rank}: {build_name}{percent_increase}\n", "Result.TLabel")
             self.results_text.insert(tk.END, f"  Average Heal: {data['avg_heal']:.2f}\n")
@@ -566,136 +1372,188 @@ The curves help visualize diminishing returns, showing where additional stat poi
             self.results_text.insert(tk.END, f"  Proc Chances:\n")
             self.results_text.insert(tk.END, f"    Crit: {data['crit_percentage']:.2f}%\n")
             self.results_text.insert(tk.END, f"    HAC: {data['hac_percentage']:.2f}%\n")
-            self.results_text.insert(tk.END, f"    Crit+HAC: {data['crit_hac_percentage']:.2f}%\n\n")
+            self.results_text.insert(tk.END, f"    Crit+HAC: {data['crit_hac_percentage']:.2f}%\n")
+            if data['trials']:
+                self.results_text.insert(tk.END, f"  Trials: {data['trials']:,} (avg heal ± {data['avg_heal_ci']:.2f}, 95% CI)\n")
+            self.results_text.insert(tk.END, "\n")
             rank += 1
     
-    def analyze_and_display_stat_curves(self, base_min_damage, base_max_damage, skill_heal, sdb, hac, crit):
-        # Analyze each stat's effectiveness
-        sdb_analysis = analyze_stat_effectiveness(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, "sdb")
-        hac_analysis = analyze_stat_effectiveness(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, "hac")
-        crit_analysis = analyze_stat_effectiveness(base_min_damage, base_max_damage, skill_heal, sdb, hac, crit, "crit")
-        
-        # Plot SDB curve
-        self.plot_stat_curve(
-            self.sdb_figure, 
-            self.sdb_canvas,
-            sdb_analysis, 
-            "Skill Damage Boost", 
-            "sdb", 
-            sdb, 
-            3000
-        )
-        
-        # Plot HAC curve
-        self.plot_stat_curve(
-            self.hac_figure, 
-            self.hac_canvas,
-            hac_analysis, 
-            "Heavy Attack Chance", 
-            "hac", 
-            hac, 
-            1000
-        )
-        
-        # Plot Crit curve
-        self.plot_stat_curve(
-            self.crit_figure, 
-            self.crit_canvas,
-            crit_analysis, 
-            "Critical Hit Chance", 
-            "crit", 
-            crit, 
-            6000
-        )
+    def store_curve(self, stat, key, analysis, current_value):
+        """Keep a stat's new sweep and draw it now if its tab is showing, else when the tab is opened"""
+        self.curve_data[stat] = (key, analysis, current_value)
+        self.curves_to_draw.add(stat)
+        if stat == self.visible_stat():
+            self.show_curve(stat)
     
-    def plot_stat_curve(self, figure, canvas, analysis_data, stat_name, stat_key, current_value, cap_value):
-        # Clear the figure
+    def show_curve(self, stat):
+        """Draw a stat tab's latest sweep, unless the tab already shows it"""
+        if stat not in self.curves_to_draw:
+            return
+        self.curves_to_draw.discard(stat)
+        _, analysis, current_value = self.curve_data[stat]
+        stat_name, cap_value = CURVE_TABS[stat]
+        with timed(self.timings, "curves: display"):
+            self.plot_stat_curve(*self.stat_plot(stat), analysis, stat_name, stat, current_value, cap_value)
+    
+    def build_stat_curve(self, figure, canvas, stat_name, cap_value):
+        """Create a stat-curve tab's axes and artists once; plot_stat_curve then only updates them
+        
+        Everything that moves with the results is animated, so it is left out of the
+        cached background and can be blitted on top of it. Layout runs on the first
+        draw and on resize only.
+        """
         figure.clear()
         
         # Create subplot grid
         gs = figure.add_gridspec(2, 1, height_ratios=[2, 1])
         
-        # Extract data for plotting
-        stat_values = [item["value"] for item in analysis_data]
-        heal_values = [item["avg_heal"] for item in analysis_data]
-        effective_values = [item[f"{stat_key}_maxroll"] * 100 for item in analysis_data]
-        
-        # Calculate marginal effectiveness
-        marginal_effectiveness = []
-        for i in range(1, len(heal_values)):
-            delta_stat = stat_values[i] - stat_values[i-1]
-            delta_heal = heal_values[i] - heal_values[i-1]
-            if delta_stat > 0:
-                effectiveness = delta_heal / delta_stat
-                marginal_effectiveness.append(effectiveness)
-            else:
-                marginal_effectiveness.append(0)
-        # Add a placeholder for the first point
-        marginal_effectiveness = [marginal_effectiveness[0]] + marginal_effectiveness
-        
-        # Plot the heal curve
+        # The heal curve
         ax1 = figure.add_subplot(gs[0])
-        line1, = ax1.plot(stat_values, heal_values, 'b-', label='Avg Heal')
+        heal_line, = ax1.plot([], [], 'b-', label='Avg Heal', animated=True)
         ax1.set_ylabel('Average Heal', color='b')
         ax1.tick_params(axis='y', labelcolor='b')
         ax1.set_title(f'{stat_name} Effectiveness Curve')
         ax1.grid(True, alpha=0.3)
         
-        # Add vertical line for current value
-        ax1.axvline(x=current_value, color='r', linestyle='--', alpha=0.7, 
-                   label=f'Current ({current_value:.0f})')
-        
-        # Add soft cap indicator
+        # Vertical lines for the current value and the soft cap
+        current_line = ax1.axvline(x=0, color='r', linestyle='--', alpha=0.7, label='Current', animated=True)
         ax1.axvline(x=cap_value/2, color='orange', linestyle=':', alpha=0.7,
                    label=f'Soft Cap ({cap_value/2:.0f})')
-                   
-        # Add text labels - moved to avoid overlap
-        current_y = np.interp(current_value, stat_values, heal_values)
-        ax1.annotate('', xy=(current_value, current_y), xytext=(20, -30),
+        heal_arrow = ax1.annotate('', xy=(0, 0), xytext=(20, -30),
              textcoords="offset points",
-             arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=.2"))
-
+             arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=.2"), animated=True)
         
-        # Plot the maxroll/effectiveness curve
+        # The maxroll/effectiveness curve
         ax2 = figure.add_subplot(gs[1])
-        ax2.plot(stat_values, effective_values, 'g-', label='Stat %')
+        effect_line, = ax2.plot([], [], 'g-', label='Stat %', animated=True)
         ax2.set_ylabel('Effective %', color='g')
         ax2.set_xlabel(f'{stat_name} Value')
         ax2.tick_params(axis='y', labelcolor='g')
         ax2.set_ylim(0, 100)
         ax2.grid(True, alpha=0.3)
         
-        # Add text showing current effectiveness - moved to avoid overlap
-        current_effect = np.interp(current_value, stat_values, effective_values)
-        ax2.annotate(f'{current_effect:.1f}%',
-                    xy=(current_value, current_effect),
-                    xytext=(15, 10),  # Adjusted position
+        # Current effectiveness label and the vertical lines of the second plot
+        effect_label = ax2.annotate('', xy=(0, 0), xytext=(15, 10),
                     textcoords="offset points",
-                    arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=.2"))
-                    
-        # Add vertical lines to the second plot too
-        ax2.axvline(x=current_value, color='r', linestyle='--', alpha=0.7)
+                    arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=.2"), animated=True)
+        effect_current_line = ax2.axvline(x=0, color='r', linestyle='--', alpha=0.7, animated=True)
         ax2.axvline(x=cap_value/2, color='orange', linestyle=':', alpha=0.7)
         
-        ax1.legend(loc='upper left', bbox_to_anchor=(1, 1))
-
-        # Add key stats to the plot - moved to better position
-        textstr = f'''
+        # Heal gained per extra stat point, on its own scale
+        ax3 = ax2.twinx()
+        marginal_line, = ax3.plot([], [], color='purple', linestyle='-.', label='Heal / Point', animated=True)
+        ax3.set_ylabel('Heal per Point', color='purple')
+        ax3.tick_params(axis='y', labelcolor='purple')
+        
+        legend = ax1.legend(loc='upper left', bbox_to_anchor=(1, 1))
+        
+        # Key stats box
+        props = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
+        stats_text = ax1.text(1.02, -0.3, '', transform=ax1.transAxes, fontsize=8,
+        verticalalignment='top', horizontalalignment='left', bbox=props, animated=True)
+        
+        curve = {
+            "figure": figure,
+            "canvas": canvas,
+            "axes": (ax1, ax2, ax3),
+            "lines": (heal_line, effect_line, marginal_line),
+            "current_lines": (current_line, effect_current_line),
+            "heal_arrow": heal_arrow,
+            "effect_label": effect_label,
+            "stats_text": stats_text,
+            "current_label": legend.get_texts()[1],
+            "animated": [heal_line, current_line, heal_arrow, effect_line, effect_label, effect_current_line, marginal_line, stats_text],
+            "limits": None,
+            "background": None,
+            "needs_layout": True
+        }
+        canvas.mpl_connect("draw_event", lambda event: self.cache_curve_background(curve))
+        canvas.mpl_connect("resize_event", lambda event: curve.update(needs_layout=True))
+        return curve
+    
+    def cache_curve_background(self, curve):
+        """After any full draw (ours, a resize or an expose), keep the static background and put the curves back on it"""
+        curve["background"] = curve["canvas"].copy_from_bbox(curve["figure"].bbox)
+        for artist in curve["animated"]:
+            curve["figure"].draw_artist(artist)
+    
+    def plot_stat_curve(self, figure, canvas, analysis_data, stat_name, stat_key, current_value, cap_value):
+        update_start = time.perf_counter()
+        curve = self.stat_curves.get(stat_key)
+        if curve is None or curve["figure"] is not figure:
+            curve = self.stat_curves[stat_key] = self.build_stat_curve(figure, canvas, stat_name, cap_value)
+        ax1, ax2, ax3 = curve["axes"]
+        
+        # The sweep's columns are plotted as they are, without copying
+        stat_values = analysis_data["value"]
+        heal_values = analysis_data["avg_heal"]
+        effective_values = analysis_data[f"{stat_key}_maxroll"] * 100
+        marginal_values = analysis_data["marginal_heal"]
+        current_y = np.interp(current_value, stat_values, heal_values)
+        current_effect = np.interp(current_value, stat_values, effective_values)
+        current_marginal = np.interp(current_value, stat_values, marginal_values)
+        
+        # Move the animated artists to the new results
+        heal_line, effect_line, marginal_line = curve["lines"]
+        heal_line.set_data(stat_values, heal_values)
+        effect_line.set_data(stat_values, effective_values)
+        marginal_line.set_data(stat_values, marginal_values)
+        for line in curve["current_lines"]:
+            line.set_xdata([current_value, current_value])
+        curve["heal_arrow"].xy = (current_value, current_y)
+        curve["effect_label"].xy = (current_value, current_effect)
+        curve["effect_label"].set_text(f'{current_effect:.1f}%')
+        curve["stats_text"].set_text(f'''
 Current {stat_name}: {current_value:.0f}
 Effective %: {current_effect:.1f}%
 Avg Heal: {current_y:.0f}
+Heal per Point: {current_marginal:.3f}
 Soft Cap: {cap_value/2:.0f}
 Hard Cap: {cap_value:.0f}
-'''     
-        # Stats Box
-        props = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
-        ax1.text(1.02, -0.3, textstr, transform=ax1.transAxes, fontsize=8,
-        verticalalignment='top', horizontalalignment='left', bbox=props)
-
-
-        
-        figure.tight_layout()
-        canvas.draw()
+''')
+        
+        # The axes show the swept range and the soft cap; the heal range is kept while the
+        # new curve still fills most of it, so small changes leave the background valid
+        x_low, x_high = min(stat_values[0], cap_value/2), max(stat_values[-1], cap_value/2)
+        x_margin = 0.05 * (x_high - x_low)
+        xlim = (x_low - x_margin, x_high + x_margin)
+        ylim, marginal_ylim = (None, None) if curve["limits"] is None else curve["limits"][1:3]
+        ylim = sticky_limits(ylim, heal_values.min(), heal_values.max())
+        marginal_ylim = sticky_limits(marginal_ylim, marginal_values.min(), marginal_values.max())
+        limits = (xlim, ylim, marginal_ylim, f'Current ({current_value:.0f})')
+        
+        update_seconds = time.perf_counter() - update_start
+        layout_seconds = None
+        if limits != curve["limits"] or curve["background"] is None or curve["needs_layout"]:
+            # The background itself changes: full redraw, which re-caches it through the draw event
+            curve["limits"] = limits
+            ax1.set_xlim(xlim)
+            ax2.set_xlim(xlim)
+            ax1.set_ylim(ylim)
+            ax3.set_ylim(marginal_ylim)
+            curve["current_label"].set_text(limits[3])
+            if curve["needs_layout"]:
+                layout_start = time.perf_counter()
+                figure.tight_layout()
+                curve["needs_layout"] = False
+                layout_seconds = time.perf_counter() - layout_start
+            draw_start = time.perf_counter()
+            canvas.draw()
+            stage = "plot: canvas.draw"
+        else:
+            # Only the curves moved: paint them over the cached background
+            draw_start = time.perf_counter()
+            canvas.restore_region(curve["background"])
+            for artist in curve["animated"]:
+                figure.draw_artist(artist)
+            canvas.blit(figure.bbox)
+            stage = "plot: blit"
+        
+        if self.timings is not None:
+            self.timings.add("plot: update artists", update_seconds)
+            if layout_seconds is not None:
+                self.timings.add("plot: tight_layout", layout_seconds)
+            self.timings.add(stage, time.perf_counter() - draw_start)
 
 if __name__ == "__main__":
     root = tk.Tk()
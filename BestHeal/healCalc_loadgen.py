@@ -0,0 +1,91 @@
+import argparse
+import http.client
+import json
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+import numpy as np
+
+def request_body(endpoint, index, mode, trials, seed):
+    """A request for a build that varies with index, so batches hold distinct builds"""
+    body = {
+        "base_min_damage": 157,
+        "base_max_damage": 306,
+        "skill_heal": 0.5591,
+        "sdb": 300 + index % 400,
+        "hac": 400 + index % 500,
+        "crit": 500 + index % 600,
+        "mode": mode,
+        "trials": trials
+    }
+    if seed is not None:
+        body["seed"] = seed
+    if endpoint == "sweep":
+        body["stats"] = ["sdb", "hac", "crit"][index % 3]
+    return json.dumps(body).encode()
+
+def run_client(url, endpoint, indices, mode, trials, seed, latencies, failures):
+    """Send one request per index over a single persistent connection"""
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80)
+    connection.connect()
+    connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    headers = {"Content-Type": "application/json"}
+    for index in indices:
+        body = request_body(endpoint, index, mode, trials, seed)
+        start = time.perf_counter()
+        connection.request("POST", f"/{endpoint}", body, headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            failures.append(response.status)
+    connection.close()
+
+def get_json(url, path):
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80)
+    connection.request("GET", path)
+    response = json.loads(connection.getresponse().read())
+    connection.close()
+    return response
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive a running healCalc_server with concurrent requests")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--endpoint", choices=["heal", "compare", "sweep"], default="heal")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32, help="Clients sending requests at the same time")
+    parser.add_argument("--mode", choices=["analytic", "monte_carlo"], default="analytic")
+    parser.add_argument("--trials", type=int, default=10000)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    url = urlsplit(args.url)
+
+    # list.append is atomic, so the clients share the result lists
+    latencies, failures = [], []
+    clients = [
+        threading.Thread(target=run_client, args=(
+            url, args.endpoint, range(client, args.requests, args.concurrency),
+            args.mode, args.trials, args.seed, latencies, failures
+        ))
+        for client in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(np.array(latencies) * 1000, [50, 90, 99])
+    print(f"{len(latencies):,} /{args.endpoint} requests in {elapsed:.2f}s ({len(latencies) / elapsed:,.0f} req/s), {len(failures)} failed")
+    print(f"Client latency: p50 {p50:.1f} ms, p90 {p90:.1f} ms, p99 {p99:.1f} ms")
+
+    stats = get_json(url, "/stats")
+    for endpoint, latency in stats["latency"].items():
+        print(f"Server {endpoint}: {latency['requests']:,} requests, p50 {latency['p50_ms']:.1f} ms, p90 {latency['p90_ms']:.1f} ms, p99 {latency['p99_ms']:.1f} ms")
+    batching = stats["batching"]
+    print(f"Batching: {batching['requests']:,} /heal requests in {batching['batches']:,} batches (mean {batching['mean_batch_size']:.1f}, largest {batching['largest_batch']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from healCalc import BUILD_FIELDS, rune_builds
+from healCalc_engine import (
+    evaluate_builds, compare_builds, analyze_stat_effectiveness, roll_stream, cache_key, cached_call, record_dict,
+    records_as_dicts, HealResult, ResultCache
+)
+
+MODES = ["analytic", "monte_carlo"]
+STATS = ["sdb", "hac", "crit"]
+MAX_TRIALS = 5000000
+# Latencies kept per endpoint for the percentiles in /stats
+LATENCY_SAMPLES = 10000
+
+def to_json(value):
+    """json.dumps default for the numpy scalars, arrays and result records in engine results"""
+    if isinstance(value, HealResult):
+        return value.as_dict()
+    if isinstance(value, np.ndarray) and value.dtype.names:
+        return records_as_dicts(value)
+    if isinstance(value, np.record):
+        return record_dict(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def read_build(request):
+    """The six BUILD_FIELDS of a request as floats"""
+    build = []
+    for field in BUILD_FIELDS:
+        if field not in request:
+            raise ValueError(f"missing field {field!r}")
+        build.append(float(request[field]))
+    return build
+
+def read_settings(request, default_mode="monte_carlo"):
+    """(mode, trials, seed, target_ci) of a request, checked before any work is queued"""
+    mode = request.get("mode", default_mode)
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    trials = int(request.get("trials", 10000))
+    if not 1 <= trials <= MAX_TRIALS:
+        raise ValueError(f"trials must be between 1 and {MAX_TRIALS:,}")
+    # A precision that can never be met would run every build to the trial cap
+    target_ci = request.get("target_ci")
+    if target_ci is not None:
+        target_ci = float(target_ci)
+        if not (math.isfinite(target_ci) and target_ci > 0):
+            raise ValueError("target_ci must be a positive number")
+    # Truncating 1.5 to 1 would quietly return another seed's results
+    seed = request.get("seed")
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+        raise ValueError("seed must be a non-negative integer")
+    return mode, trials, seed, target_ci
+
+class HealBatcher:
+    """Coalesces concurrent /heal requests into vectorized evaluate_builds calls
+
+    Requests arriving within max_wait seconds of the first one in a batch (up to
+    max_batch of them) are grouped by (mode, trials, seed), or just by mode when
+    analytic, and each group is evaluated in one pass on the executor. Seeded
+    Monte Carlo groups share one roll stream, so a request's result does not
+    depend on what it was batched with.
+    """
+    def __init__(self, executor, max_batch=256, max_wait=0.005):
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.batched_requests = 0
+        self.largest_batch = 0
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def submit(self, build, settings):
+        # Analytic results ignore trials and seed, so all analytic requests share one group
+        if settings[0] == "analytic":
+            settings = ("analytic", None, None)
+        future = Future()
+        self.requests.put((build, settings, future))
+        return future
+
+    def run(self):
+        while True:
+            batch = [self.requests.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+            for settings, items in groups.items():
+                self.executor.submit(self.evaluate, settings, items)
+
+    def evaluate(self, settings, items):
+        mode, trials, seed = settings
+        try:
+            columns = np.array([build for build, _, _ in items]).T
+            rolls = None if mode == "analytic" else roll_stream(trials, seed)
+            results = evaluate_builds(*columns, mode=mode, rolls=rolls)
+        except Exception as error:
+            for _, _, future in items:
+                future.set_exception(error)
+            return
+
+        with self.lock:
+            self.batches += 1
+            self.batched_requests += len(items)
+            self.largest_batch = max(self.largest_batch, len(items))
+        for index, (_, _, future) in enumerate(items):
+            future.set_result(record_dict(results[index]))
+
+    def report(self):
+        with self.lock:
+            return {
+                "batches": self.batches,
+                "requests": self.batched_requests,
+                "mean_batch_size": self.batched_requests / max(self.batches, 1),
+                "largest_batch": self.largest_batch
+            }
+
+class LatencyStats:
+    """Request counts and recent latency percentiles per endpoint"""
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.samples = samples
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.counts = {}
+        self.errors = {}
+
+    def record(self, endpoint, seconds, ok=True):
+        with self.lock:
+            self.latencies.setdefault(endpoint, deque(maxlen=self.samples)).append(seconds)
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + (not ok)
+
+    def report(self):
+        with self.lock:
+            latencies = {endpoint: np.array(values) * 1000 for endpoint, values in self.latencies.items()}
+            counts, errors = dict(self.counts), dict(self.errors)
+
+        report = {}
+        for endpoint, values in latencies.items():
+            p50, p90, p99 = np.percentile(values, [50, 90, 99])
+            report[endpoint] = {
+                "requests": counts[endpoint],
+                "errors": errors[endpoint],
+                "p50_ms": p50,
+                "p90_ms": p90,
+                "p99_ms": p99,
+                "max_ms": values.max()
+            }
+        return report
+
+def handle_heal(server, request):
+    """calculate_heal's statistics for one build, evaluated in a batch with concurrent requests"""
+    build = read_build(request)
+    settings = read_settings(request)[:3]
+    return server.batcher.submit(build, settings).result()
+
+def handle_compare(server, request):
+    """Every rune build's results and paired gain over the base build"""
+    base_min_damage, base_max_damage, skill_heal, sdb, hac, crit = read_build(request)
+    mode, trials, seed, target_ci = read_settings(request)
+    builds = rune_builds(skill_heal, sdb, hac, crit)
+    results = server.executor.submit(
+        compare_builds, base_min_damage, base_max_damage, builds, "Base", mode,
+        bool(request.get("paired", True)), trials, target_ci,
+        seed, 1, server.cache
+    ).result()
+    # The histograms are for plotting and would dwarf the rest of the response
+    return {
+        name: {key: value for key, value in result.items() if key != "histogram"}
+        for name, result in results.items()
+    }
+
+def handle_sweep(server, request):
+    """Average heal over a range of each requested stat around its current value"""
+    build = read_build(request)
+    mode, trials, seed, _ = read_settings(request)
+    range_points = int(request.get("range_points", 20))
+    if not 2 <= range_points <= 1000:
+        raise ValueError("range_points must be between 2 and 1000")
+    stats = request.get("stats", STATS)
+    if isinstance(stats, str):
+        stats = [stats]
+    for stat in stats:
+        if stat not in STATS:
+            raise ValueError(f"stats must be drawn from {STATS}")
+
+    # Unseeded draws never repeat, so only reproducible sweeps are cached
+    cache = server.cache if mode == "analytic" or seed is not None else None
+    futures = {
+        stat: server.executor.submit(
+            cached_call, cache, cache_key("sweep_records", *build, stat, range_points, trials, mode, seed),
+            analyze_stat_effectiveness, *build, stat, range_points, trials, mode, None, seed
+        )
+        for stat in stats
+    }
+    return {stat: future.result() for stat, future in futures.items()}
+
+ROUTES = {
+    "/heal": handle_heal,
+    "/compare": handle_compare,
+    "/sweep": handle_sweep
+}
+
+class HealRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self.send_json(200, {
+                "latency": self.server.latency.report(),
+                "batching": self.server.batcher.report(),
+                "cache": {"entries": len(self.server.cache), "hits": self.server.cache.hits, "misses": self.server.cache.misses}
+            })
+        else:
+            self.send_json(404, {"error": f"unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        route = ROUTES.get(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if route is None:
+            self.send_json(404, {"error": f"unknown endpoint {self.path}"})
+            return
+
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("request body must be a JSON object")
+            status, response = 200, route(self.server, request)
+        except (ValueError, TypeError) as error:
+            status, response = 400, {"error": str(error)}
+        except Exception as error:
+            status, response = 500, {"error": f"{type(error).__name__}: {error}"}
+
+        self.send_json(status, response)
+        self.server.latency.record(self.path, time.perf_counter() - start, status == 200)
+
+    def send_json(self, status, response):
+        body = json.dumps(response, default=to_json).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class HealServer(ThreadingHTTPServer):
+    """HTTP server whose connection threads only parse and wait; the calculations run on a shared worker pool"""
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, workers=4, max_batch=256, max_wait=0.005, cache_size=256, verbose=False):
+        super().__init__(address, HealRequestHandler)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.batcher = HealBatcher(self.executor, max_batch, max_wait)
+        self.latency = LatencyStats()
+        self.cache = ResultCache(maxsize=cache_size)
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the heal calculator as a local JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4, help="Threads running the calculations")
+    parser.add_argument("--max-batch", type=int, default=256, help="Most /heal requests evaluated in one batch")
+    parser.add_argument("--max-wait", type=float, default=5, help="Milliseconds to wait for more /heal requests to batch")
+    parser.add_argument("--cache-size", type=int, default=256, help="Seeded and analytic results kept in memory")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    server = HealServer(
+        (args.host, args.port), args.workers, args.max_batch, args.max_wait / 1000, args.cache_size, args.verbose
+    )
+    print(f"Serving on http://{args.host}:{server.server_address[1]} (POST /heal, /compare, /sweep; GET /stats, /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()